@@ -1,5 +1,5 @@
 from typing import List
-from domashna1.data.db import Database
+from domashna1.data.db import Database, BUMP_VERSION_SQL, COINS_VERSION_KEY
 from domashna1.model.coin import Coin
 
 
@@ -24,6 +24,8 @@ class CoinRepository:
             ]
 
             cursor.executemany(insert_sql, coin_rows)
+            # vo istata transakcija, za kesot nikogas da ne vidi nova verzija so stari podatoci
+            cursor.execute(BUMP_VERSION_SQL, (COINS_VERSION_KEY,))
             conn.commit()
 
         except Exception as ex:
@@ -1,17 +1,116 @@
 import sqlite3
 import logging
-from typing import Optional, List, Tuple, Dict
+from datetime import date
+from typing import Optional, List, Tuple, Dict, Iterable
 
+from domashna1.model.interval import history_table, interval_ms
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# verzija na coins katalogot; web aplikacijata ja sledi za da go osvezi svojot kes
+COINS_VERSION_KEY = "coins_version"
+
+# verzija na history tabelite; se zgolemuva so sekoja transakcija sto zapisuva svecki
+HISTORY_VERSION_KEY = "history_version"
+
+BUMP_VERSION_SQL = """
+    INSERT INTO meta (key, value) VALUES (?, 1)
+    ON CONFLICT (key) DO UPDATE SET value = value + 1
+"""
+
+# redosled na coins za listanje (keyset paginacija): coins bez rank odat na kraj
+COINS_ORDER_KEY = "IFNULL(market_cap_rank, 9223372036854775807)"
+
+# datumite vo history se cuvaat kako cel broj denovi od 1970-01-01
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# ist raspored za site history tabeli: dnevnite/nedelnite/mesecnite so kolona
+# day, intraday so slot kolona t. Intraday tabelite nemaat dopolnitelni indeksi
+# bidejki minutnite podatoci rastat do stotici milioni redovi.
+HISTORY_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        symbol TEXT NOT NULL,
+        {column} INTEGER NOT NULL,
+        open REAL,
+        high REAL,
+        low REAL,
+        close REAL,
+        volume REAL,
+        PRIMARY KEY (symbol, {column})
+    ) WITHOUT ROWID
+"""
+
+
+def date_to_day(value: str) -> int:
+    return date.fromisoformat(value).toordinal() - EPOCH_ORDINAL
+
+
+def day_to_date(day: int) -> str:
+    return date.fromordinal(day + EPOCH_ORDINAL).isoformat()
+
+
+def bucket_sql(day_expr: str, target: str) -> str:
+    # SQL izraz za denot na koj pocnuva periodot sto go sodrzi `day_expr`
+    if target == "1d":
+        return day_expr
+    if target == "1w":
+        # 1970-01-01 e cetvrtok, pa +3 go pomestuva pocetokot na ponedelnik
+        return f"({day_expr}) - (({day_expr}) + 3) % 7"
+    if target == "1M":
+        return (
+            f"CAST(julianday(date(({day_expr}) * 86400, 'unixepoch', 'start of month'))"
+            f" - 2440587.5 AS INTEGER)"
+        )
+    raise ValueError(f"Nepoddrzan rollup interval '{target}'")
+
+
+def bucket_start(day: int, target: str) -> int:
+    # isto kako bucket_sql, za eden den vo Python
+    if target == "1d":
+        return day
+    if target == "1w":
+        return day - (day + 3) % 7
+    if target == "1M":
+        return date.fromordinal(day + EPOCH_ORDINAL).replace(day=1).toordinal() - EPOCH_ORDINAL
+    raise ValueError(f"Nepoddrzan rollup interval '{target}'")
+
+
+def next_bucket_start(day: int, target: str) -> int:
+    start = bucket_start(day, target)
+    if target == "1M":
+        return bucket_start(start + 31, target)
+    return start + (7 if target == "1w" else 1)
+
+
+# (symbol, slot, open, high, low, close, volume) — red vo formatot na tabelata;
+# za 1d slot-ot e denot od 1970-01-01
+HistoryRow = Tuple[str, int, float, float, float, float, float]
+
+
+def history_row(row: dict) -> HistoryRow:
+    return (row["symbol"], date_to_day(row["date"]), row["open"], row["high"], row["low"], row["close"], row["volume"])
+
+
 class Database:
 
     def __init__(self, path: str = "crypto.db"):
-        self.conn = sqlite3.connect(path)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self._history_tables = {"history"}
+        self._configure()
         self.create_tables()
 
+    def _configure(self) -> None:
+
+        try:
+            # WAL: citanjeto ne go blokira pisuvanjeto od HistoryWriter
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA temp_store=MEMORY")
+            self.conn.execute("PRAGMA cache_size=-65536")
+        except sqlite3.Error as err:
+            logger.error(f"Ne uspeav da gi postavam pragma podesuvanjata: {err}")
+
     def create_tables(self) -> None:
 
         try:
@@ -26,16 +125,19 @@ class Database:
                     )
                 """)
 
+                # ist izraz kako COINS_ORDER_KEY, inaku SQLite ne go koristi indeksot
+                self.conn.execute(f"""
+                    CREATE INDEX IF NOT EXISTS coins_rank_idx ON coins ({COINS_ORDER_KEY}, id)
+                """)
+
                 self.conn.execute("""
-                    CREATE TABLE IF NOT EXISTS history (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        symbol TEXT,
-                        date TEXT,
-                        open REAL,
-                        high REAL,
-                        low REAL,
-                        close REAL,
-                        volume REAL
+                    CREATE INDEX IF NOT EXISTS coins_market_cap_idx ON coins (market_cap)
+                """)
+
+                self.conn.execute("""
+                    CREATE TABLE IF NOT EXISTS meta (
+                        key TEXT PRIMARY KEY,
+                        value INTEGER NOT NULL
                     )
                 """)
 
@@ -50,21 +152,54 @@ class Database:
                     )
                 """)
 
+            self._migrate_history()
+
+            with self.conn:
+                self.conn.execute(HISTORY_TABLE_SQL.format(table="history", column="day"))
+
+                # (day, symbol) indeks za prebaruvanja po datum niz site coins
+                self.conn.execute("""
+                    CREATE INDEX IF NOT EXISTS history_day_idx ON history (day)
+                """)
+
         except sqlite3.Error as err:
             logger.error(f"Ne uspeav da gi kreiram tabelite: {err}")
 
+    def _migrate_history(self) -> None:
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(history)")]
+        if "date" not in columns:
+            return
+
+        logger.info("Migriram stara history tabela vo (symbol, day) format...")
+
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute("ALTER TABLE history RENAME TO history_old")
+            self.conn.execute(HISTORY_TABLE_SQL.format(table="history", column="day"))
+
+            # ORDER BY id: pri duplikati ostanuva posledniot vnesen red
+            self.conn.execute("""
+                INSERT OR REPLACE INTO history (symbol, day, open, high, low, close, volume)
+                SELECT symbol, CAST(julianday(date) - 2440587.5 AS INTEGER),
+                       open, high, low, close, volume
+                FROM history_old
+                WHERE symbol IS NOT NULL AND julianday(date) IS NOT NULL
+                ORDER BY id
+            """)
+            self.conn.execute("DROP TABLE history_old")
+
     def get_last_date(self, symbol: str) -> Optional[str]:
 
         cursor = self.conn.cursor()
         try:
             cursor.execute("""
-                SELECT MAX(date)
+                SELECT MAX(day)
                 FROM history
                 WHERE symbol = ?
             """, (symbol,))
 
             row = cursor.fetchone()
-            return row[0] if row and row[0] else None
+            return day_to_date(row[0]) if row and row[0] is not None else None
 
         except sqlite3.Error as err:
             logger.error(f"Greska pri baranje posledna data za '{symbol}': {err}")
@@ -73,39 +208,198 @@ class Database:
         finally:
             cursor.close()
 
+    def get_last_slots(self, symbols: List[str], interval: str = "1d") -> Dict[str, Optional[int]]:
+
+        last_slots: Dict[str, Optional[int]] = {s: None for s in symbols}
+        unique = list(last_slots)
+
+        cursor = self.conn.cursor()
+        try:
+            table, column = self._ensure_history_table(interval)
+
+            # SQLite ima limit na broj parametri, pa prasuvame vo delovi
+            for i in range(0, len(unique), 500):
+                chunk = unique[i:i + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                cursor.execute(f"""
+                    SELECT symbol, MAX({column})
+                    FROM {table}
+                    WHERE symbol IN ({placeholders})
+                    GROUP BY symbol
+                """, chunk)
+
+                for symbol, slot in cursor.fetchall():
+                    last_slots[symbol] = slot
+
+        except sqlite3.Error as err:
+            logger.error(f"Greska pri baranje posledni {interval} svecki za {len(unique)} simboli: {err}")
+
+        finally:
+            cursor.close()
+
+        return last_slots
+
+    def get_last_dates(self, symbols: List[str]) -> Dict[str, Optional[str]]:
+        return {
+            symbol: day_to_date(day) if day is not None else None
+            for symbol, day in self.get_last_slots(symbols).items()
+        }
+
     def insert_history_rows(self, rows: list[dict]) -> None:
+        self.insert_history_batch(history_row(r) for r in rows)
+
+    def insert_history_batch(self, rows: Iterable[HistoryRow], interval: str = "1d") -> None:
 
         try:
             with self.conn:
-                self.conn.executemany("""
-                    INSERT OR REPLACE INTO history
-                    (symbol, date, open, high, low, close, volume)
-                    VALUES (:symbol, :date, :open, :high, :low, :close, :volume)
-                """, rows)
+                self._insert_history(rows, interval)
         except sqlite3.Error as err:
-            import logging
-            logging.error(f"Greska pri vnesuvanje na history redovi: {err}")
+            logger.error(f"Greska pri vnesuvanje na {interval} history redovi: {err}")
 
     def save_daily_stats(self, stats: Dict[str, float]) -> None:
 
         try:
             with self.conn:
-                self.conn.execute("""
-                    INSERT OR REPLACE INTO daily_stats
-                    (symbol, last_price, high_24h, low_24h, volume_24h, liquidity)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    stats["symbol"],
-                    stats["last_price"],
-                    stats["high_24h"],
-                    stats["low_24h"],
-                    stats["volume_24h"],
-                    stats["liquidity"]
-                ))
+                self._insert_daily_stats([stats])
 
         except sqlite3.Error as err:
             logger.error(f"Greska pri cuvanje na daily stats za {stats.get('symbol')}: {err}")
 
+    def save_all_daily_stats(self, stats: List[Dict[str, float]]) -> None:
+
+        try:
+            with self.conn:
+                self._insert_daily_stats(stats)
+
+        except sqlite3.Error as err:
+            logger.error(f"Greska pri cuvanje na daily stats za {len(stats)} simboli: {err}")
+
+    def save_batch(
+        self,
+        history_rows: Dict[str, List[HistoryRow]],
+        daily_stats: List[Dict[str, float]]
+    ) -> bool:
+
+        try:
+            with self.conn:
+                for interval, rows in history_rows.items():
+                    self._insert_history(rows, interval)
+                self._insert_daily_stats(daily_stats)
+            return True
+
+        except sqlite3.Error as err:
+            total = sum(len(rows) for rows in history_rows.values())
+            logger.error(f"Greska pri cuvanje na batch ({total} history, {len(daily_stats)} daily stats): {err}")
+            return False
+
+    def rollup_history(self, symbols: List[str], source: str = "1d", target: str = "1w") -> int:
+
+        source_table, source_column = self._ensure_history_table(source)
+        target_table, _ = self._ensure_history_table(target)
+
+        step = interval_ms(source)
+        day_expr = source_column if source == "1d" else f"{source_column} * {step} / 86400000"
+        bucket = bucket_sql(day_expr, target)
+
+        # se preresmetuva samo posledniot (mozebi se uste otvoren) period
+        # i se sto e posle nego; pocetnite periodi vekje se zacuvani
+        last_buckets = self.get_last_slots(symbols, target)
+        first_slots = self._first_slots([s for s, day in last_buckets.items() if day is None], source)
+
+        params = []
+        for symbol, day in last_buckets.items():
+            if day is not None:
+                params.append((symbol, day * 86_400_000 // step))
+                continue
+
+            first = first_slots.get(symbol)
+            if first is None:
+                continue
+
+            # prv rollup: backfill sto pocnuva sred periodot bi dal nepolna sveka
+            # (pogresen open/low/high/volume), pa se pocnuva od prviot cel period
+            first_day = first * step // 86_400_000
+            start_day = bucket_start(first_day, target)
+            if start_day * 86_400_000 // step != first:
+                start_day = next_bucket_start(first_day, target)
+            params.append((symbol, start_day * 86_400_000 // step))
+
+        try:
+            with self.conn:
+                before = self.conn.total_changes
+                self.conn.executemany(f"""
+                    INSERT OR REPLACE INTO {target_table} (symbol, day, open, high, low, close, volume)
+                    SELECT g.symbol, g.bucket, o.open, g.high, g.low, c.close, g.volume
+                    FROM (
+                        SELECT symbol, {bucket} AS bucket,
+                               MIN({source_column}) AS first_slot, MAX({source_column}) AS last_slot,
+                               MAX(high) AS high, MIN(low) AS low, SUM(volume) AS volume
+                        FROM {source_table}
+                        WHERE symbol = ? AND {source_column} >= ?
+                        GROUP BY bucket
+                    ) g
+                    JOIN {source_table} o ON o.symbol = g.symbol AND o.{source_column} = g.first_slot
+                    JOIN {source_table} c ON c.symbol = g.symbol AND c.{source_column} = g.last_slot
+                """, params)
+                changed = self.conn.total_changes - before
+                if changed:
+                    self.conn.execute(BUMP_VERSION_SQL, (HISTORY_VERSION_KEY,))
+                return changed
+
+        except sqlite3.Error as err:
+            logger.error(f"Greska pri rollup {source} -> {target}: {err}")
+            return 0
+
+    def _first_slots(self, symbols: List[str], interval: str) -> Dict[str, int]:
+        first: Dict[str, int] = {}
+
+        try:
+            table, column = self._ensure_history_table(interval)
+
+            for i in range(0, len(symbols), 500):
+                chunk = symbols[i:i + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                first.update(self.conn.execute(f"""
+                    SELECT symbol, MIN({column})
+                    FROM {table}
+                    WHERE symbol IN ({placeholders})
+                    GROUP BY symbol
+                """, chunk).fetchall())
+
+        except sqlite3.Error as err:
+            logger.error(f"Greska pri baranje prvi {interval} svecki za {len(symbols)} simboli: {err}")
+
+        return first
+
+    def _ensure_history_table(self, interval: str) -> Tuple[str, str]:
+        table, column = history_table(interval)
+
+        if table not in self._history_tables:
+            self.conn.execute(HISTORY_TABLE_SQL.format(table=table, column=column))
+            self._history_tables.add(table)
+
+        return table, column
+
+    def _insert_history(self, rows: Iterable[HistoryRow], interval: str = "1d") -> None:
+        table, column = self._ensure_history_table(interval)
+
+        self.conn.executemany(f"""
+            INSERT OR REPLACE INTO {table}
+            (symbol, {column}, open, high, low, close, volume)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        self.conn.execute(BUMP_VERSION_SQL, (HISTORY_VERSION_KEY,))
+
+    def _insert_daily_stats(self, stats: List[Dict[str, float]]) -> None:
+        self.conn.executemany("""
+            INSERT OR REPLACE INTO daily_stats
+            (symbol, last_price, high_24h, low_24h, volume_24h, liquidity)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (
+            (s["symbol"], s["last_price"], s["high_24h"], s["low_24h"], s["volume_24h"], s["liquidity"])
+            for s in stats
+        ))
+
     def close(self) -> None:
 
         try:
@@ -0,0 +1,120 @@
+import logging
+import queue
+import threading
+from typing import List, Dict, Optional
+
+from domashna1.data.db import Database, HistoryRow, history_row
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class HistoryWriter(threading.Thread):
+    # Edinstven pisuvac vo bazata: fetch workerite samo gi stavaat redovite
+    # vo ogranicena redica, a ovaa nishka gi zapisuva vo golemi transakcii.
+
+    def __init__(self, path: str = "crypto.db", max_pending: int = 64, batch_rows: int = 50_000):
+        super().__init__(name="history-writer", daemon=True)
+        self.path = path
+        self.queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.batch_rows = batch_rows
+        self.written_rows = 0
+        self.failed_rows = 0
+        self.error: Optional[BaseException] = None
+
+    def _check(self) -> None:
+        # workerite da ne prodolzat so povlekuvanje ako pisuvacot vekje ne raboti
+        if self.error is not None:
+            raise RuntimeError(f"[Writer] Pisuvacot zapre: {self.error}") from self.error
+
+    def put_history(self, rows: List[dict]) -> None:
+        self.put_history_batch([history_row(r) for r in rows])
+
+    def put_history_batch(self, rows: List[HistoryRow], interval: str = "1d") -> None:
+        self._check()
+        if rows:
+            self.queue.put(("history", interval, rows))
+
+    def put_daily_stats(self, stats: Dict[str, float]) -> None:
+        self._check()
+        if stats:
+            self.queue.put(("daily_stats", None, [stats]))
+
+    def run(self) -> None:
+        db = None
+
+        try:
+            db = Database(self.path)
+            stopping = False
+
+            while not stopping:
+                history_rows: Dict[str, List[HistoryRow]] = {}
+                pending = 0
+                daily_stats: List[Dict[str, float]] = []
+                item = self.queue.get()
+
+                # gi sobirame site batch-ovi sto vekje cekaat vo edna transakcija
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                        break
+
+                    kind, interval, rows = item
+                    if kind == "history":
+                        history_rows.setdefault(interval, []).extend(rows)
+                    else:
+                        daily_stats.extend(rows)
+
+                    pending += len(rows)
+                    if pending >= self.batch_rows:
+                        break
+
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                if pending:
+                    # se broi samo ona sto e navistina zapisano
+                    if db.save_batch(history_rows, daily_stats):
+                        self.written_rows += pending - len(daily_stats)
+                    else:
+                        self.failed_rows += pending - len(daily_stats)
+
+        except Exception as ex:
+            logger.exception(f"[Writer] Neocekuvana greska, pisuvacot zavrsuva: {ex}")
+            self.error = ex
+            self._drain()
+
+        finally:
+            if db is not None:
+                db.close()
+
+    def _drain(self) -> None:
+        # redicata e ogranicena: bez praznenje workerite i close() bi cekale zasekogas
+        while self.queue.get() is not _STOP:
+            pass
+
+    def close(self) -> None:
+        self.queue.put(_STOP)
+        self.join()
+        logger.info(f"[Writer] Zapisani {self.written_rows} history redovi.")
+
+        if self.error is not None:
+            raise RuntimeError(f"[Writer] Pisuvacot zapre: {self.error}") from self.error
+        if self.failed_rows:
+            raise RuntimeError(f"[Writer] {self.failed_rows} history redovi ne se zapisani.")
+
+    def __enter__(self) -> "HistoryWriter":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self.close()
+        except RuntimeError as err:
+            # originalniot isklucok od with blokot ima prednost
+            if exc is None:
+                raise
+            logger.error(str(err))
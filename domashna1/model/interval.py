@@ -0,0 +1,49 @@
+from typing import Dict, Tuple
+
+# podrzani Binance intervali; site go delat denot bez ostatok, pa pocetokot
+# na sekoja sveka e cel broj intervali od 1970-01-01 (slot)
+INTERVAL_MS: Dict[str, int] = {
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+    "1d": 86_400_000,
+}
+
+
+# nedelni i mesecni svecki ne se povlekuvaat, tuku se gradat od zacuvanite
+# (Filter4Rollup); slot-ot e denot na koj pocnuva periodot (ponedelnik ili
+# prv vo mesecot). Tabelata e "1mo" bidejki SQLite ne pravi razlika megju
+# golemi i mali bukvi vo iminjata (history_1M == history_1m).
+ROLLUP_TABLES: Dict[str, str] = {
+    "1w": "history_1w",
+    "1M": "history_1mo",
+}
+
+
+def interval_ms(interval: str) -> int:
+    try:
+        return INTERVAL_MS[interval]
+    except KeyError:
+        raise ValueError(f"Nepoddrzan interval '{interval}', dozvoleni se: {', '.join(INTERVAL_MS)}")
+
+
+def history_table(interval: str) -> Tuple[str, str]:
+    # dnevnite svecki ostanuvaat vo `history` (kolona day), a sekoj intraday
+    # interval ima posebna tabela history_<interval> (kolona t)
+    if interval in ROLLUP_TABLES:
+        return ROLLUP_TABLES[interval], "day"
+
+    interval_ms(interval)
+    if interval == "1d":
+        return "history", "day"
+    return f"history_{interval}", "t"
+
+
+def to_slot(ts_ms: int, interval: str) -> int:
+    return ts_ms // interval_ms(interval)
+
+
+def slot_start_ms(slot: int, interval: str) -> int:
+    return slot * interval_ms(interval)
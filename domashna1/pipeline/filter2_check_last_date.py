@@ -1,12 +1,16 @@
+import asyncio
 import logging
 import time
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 
 from domashna1.data.db import Database
+from domashna1.data.history_writer import HistoryWriter
 from domashna1.service.binance_client import BinanceClient
+from domashna1.service.async_binance_client import AsyncBinanceClient
 from domashna1.model.coin import Coin
+from domashna1.model.interval import interval_ms, slot_start_ms
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -15,51 +19,110 @@ logging.basicConfig(level=logging.INFO)
 class Filter2FetchHistory:
 
 
-    def __init__(self, binance_client: BinanceClient = None):
+    def __init__(
+        self,
+        binance_client: Union[BinanceClient, AsyncBinanceClient] = None,
+        interval: str = "1d",
+        backfill_days: int = 3650
+    ):
+        interval_ms(interval)
         self.binance = binance_client if binance_client else BinanceClient()
+        self.interval = interval
+        self.backfill_days = backfill_days
 
-    def _process_single_coin(self, coin: Coin) -> Dict[str, Any]:
+    def _start_date(self, symbol: str, last_slot: Optional[int]) -> datetime:
+        if last_slot is None:
+            logger.info(f"[Filter2] {symbol}: Nema prethodna {self.interval} istorija.")
+            return datetime.now() - timedelta(days=self.backfill_days)
+
+        start_date = datetime.fromtimestamp(slot_start_ms(last_slot + 1, self.interval) / 1000)
+        logger.info(f"[Filter2] {symbol}: Prodolzuvam od {start_date}.")
+        return start_date
+
+    def _process_single_coin(self, coin: Coin, last_slot: Optional[int], writer: HistoryWriter) -> Dict[str, Any]:
 
         symbol = coin.symbol.upper()
         pair = f"{symbol}USDT"
 
-        db = Database()
-
         try:
             if not self.binance.is_supported(pair):
                 logger.info(f"[Filter2] {symbol}: Go preskoknuvam — {pair} ne e dostapen na Binance.")
                 return {"symbol": symbol, "pair": pair, "ohlcv_count": 0, "daily_stats": None}
 
-            last_date = db.get_last_date(symbol)
+            start_date = self._start_date(symbol, last_slot)
 
-            if last_date is None:
-                start_date = datetime.now() - timedelta(days=3650)
-                logger.info(f"[Filter2] {symbol}: Nema prethodna istorija.")
-            else:
-                start_date = datetime.strptime(last_date, "%Y-%m-%d") + timedelta(days=1)
-                logger.info(f"[Filter2] {symbol}: Prodolzuvam od {start_date.date()}.")
+            # sekoja stranica odi vednas kon writer-ot, bez da se cuva celata istorija
+            count = 0
+            for batch in self.binance.iter_ohlcv(pair, start_date, self.interval):
+                writer.put_history_batch(batch, self.interval)
+                count += len(batch)
 
-            rows = self.binance.fetch_ohlcv(pair, start_date)
-            if rows:
-                db.insert_history_rows(rows)
+            return {
+                "symbol": symbol,
+                "pair": pair,
+                "ohlcv_count": count,
+                "daily_stats": None
+            }
 
-            stats = self.binance.fetch_daily_stats(pair)
-            if stats:
-                db.save_daily_stats(stats)
+        except Exception as ex:
+            logger.error(f"[Filter2] Greska pri obrabotka na {pair}: {ex}")
+            return {"symbol": symbol, "pair": pair, "ohlcv_count": 0, "daily_stats": None}
+
+    async def _process_single_coin_async(
+        self,
+        coin: Coin,
+        last_slot: Optional[int],
+        writer: HistoryWriter,
+        semaphore: asyncio.Semaphore
+    ) -> Dict[str, Any]:
+
+        symbol = coin.symbol.upper()
+        pair = f"{symbol}USDT"
+
+        try:
+            if not self.binance.is_supported(pair):
+                logger.info(f"[Filter2] {symbol}: Go preskoknuvam — {pair} ne e dostapen na Binance.")
+                return {"symbol": symbol, "pair": pair, "ohlcv_count": 0, "daily_stats": None}
+
+            start_date = self._start_date(symbol, last_slot)
+
+            count = 0
+            async with semaphore:
+                async for batch in self.binance.iter_ohlcv(pair, start_date, self.interval):
+                    # redicata na writer-ot e ogranicena, pa ne go blokirame event loop-ot
+                    await asyncio.to_thread(writer.put_history_batch, batch, self.interval)
+                    count += len(batch)
 
             return {
                 "symbol": symbol,
                 "pair": pair,
-                "ohlcv_count": len(rows),
-                "daily_stats": stats
+                "ohlcv_count": count,
+                "daily_stats": None
             }
 
         except Exception as ex:
             logger.error(f"[Filter2] Greska pri obrabotka na {pair}: {ex}")
             return {"symbol": symbol, "pair": pair, "ohlcv_count": 0, "daily_stats": None}
 
-        finally:
-            db.close()
+    async def _process_async(
+        self,
+        coins: List[Coin],
+        last_slots: Dict[str, Optional[int]],
+        writer: HistoryWriter,
+        max_workers: int
+    ) -> List[Dict[str, Any]]:
+
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async with self.binance:
+            return await asyncio.gather(*(
+                self._process_single_coin_async(coin, last_slots[coin.symbol.upper()], writer, semaphore)
+                for coin in coins
+            ))
+
+    async def _fetch_all_daily_stats_async(self, pairs: List[str]) -> List[Dict[str, float]]:
+        async with self.binance:
+            return await self.binance.fetch_all_daily_stats(pairs)
 
     def process(self, coins: List[Coin], max_workers: int = 20) -> List[Dict[str, Any]]:
         logger.info("=== Filter 2: Pocnuva paralelno povlekuvanje od Binance ===")
@@ -67,14 +130,36 @@ class Filter2FetchHistory:
 
         results = []
 
-        with ThreadPoolExecutor(max_workers=max_workers) as pool:
-            tasks = {
-                pool.submit(self._process_single_coin, coin): coin.symbol.upper()
-                for coin in coins
-            }
+        # site 24h statistiki so edno baranje, namesto po edno za sekoj coin
+        pairs = [f"{coin.symbol.upper()}USDT" for coin in coins]
+        if isinstance(self.binance, AsyncBinanceClient):
+            daily_stats = asyncio.run(self._fetch_all_daily_stats_async(pairs))
+        else:
+            daily_stats = self.binance.fetch_all_daily_stats(pairs)
 
-            for future in as_completed(tasks):
-                results.append(future.result())
+        db = Database()
+        try:
+            last_slots = db.get_last_slots([coin.symbol.upper() for coin in coins], self.interval)
+            db.save_all_daily_stats(daily_stats)
+        finally:
+            db.close()
+
+        with HistoryWriter() as writer:
+            if isinstance(self.binance, AsyncBinanceClient):
+                results = asyncio.run(self._process_async(coins, last_slots, writer, max_workers))
+            else:
+                with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                    tasks = {
+                        pool.submit(self._process_single_coin, coin, last_slots[coin.symbol.upper()], writer): coin.symbol.upper()
+                        for coin in coins
+                    }
+
+                    for future in as_completed(tasks):
+                        results.append(future.result())
+
+        stats_by_pair = {stats["symbol"]: stats for stats in daily_stats}
+        for result in results:
+            result["daily_stats"] = stats_by_pair.get(result["pair"])
 
         elapsed = time.perf_counter() - start
         logger.info(f"[TIMER] Filter 2 zavrsi za {elapsed:.2f}s (coins: {len(coins)})")
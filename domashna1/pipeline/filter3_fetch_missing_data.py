@@ -1,22 +1,25 @@
 import logging
-from datetime import datetime, time as dt_time
+from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from domashna1.data.db import Database
+from domashna1.data.history_writer import HistoryWriter
 from domashna1.service.binance_client import BinanceClient
 from domashna1.model.coin import Coin
+from domashna1.model.interval import interval_ms, slot_start_ms
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 
 class Filter3FillMissing:
-    def __init__(self, binance_client: BinanceClient = None):
+    def __init__(self, binance_client: BinanceClient = None, interval: str = "1d"):
+        interval_ms(interval)
         self.binance = binance_client if binance_client else BinanceClient()
+        self.interval = interval
 
-    def _process_single(self, coin: Coin) -> Dict[str, Any]:
-        db = Database()
+    def _process_single(self, coin: Coin, last_slot: Optional[int], writer: HistoryWriter) -> Dict[str, Any]:
         symbol = coin.symbol.upper()
         pair = f"{symbol}USDT"
 
@@ -25,36 +28,36 @@ class Filter3FillMissing:
                 logger.info(f"[Filter3] {symbol}: Go skokam — {pair} ne go poddrzava Binance.")
                 return {"coin": symbol, "added": 0}
 
-            last_date = db.get_last_date(pair)
-            if last_date is None:
+            if last_slot is None:
                 logger.info(f"[Filter3] {symbol}: Nema prethodni podatoci — skokni.")
                 return {"coin": symbol, "added": 0}
 
-            start_dt = datetime.combine(last_date, dt_time.min)
-            end_dt = datetime.utcnow()
+            # poslednata sveka povtorno se povlekuva bidejki mozebi bila nezatvorena
+            start_dt = datetime.fromtimestamp(slot_start_ms(last_slot, self.interval) / 1000)
+            end_dt = datetime.now()
 
             if start_dt >= end_dt:
                 logger.info(f"[Filter3] {symbol}: Nema novi podatoci.")
                 return {"coin": symbol, "added": 0}
 
-            logger.info(f"[Filter3] {symbol}: Povlekuvam podatoci od {start_dt.date()} do {end_dt.date()}.")
+            logger.info(f"[Filter3] {symbol}: Povlekuvam {self.interval} podatoci od {start_dt} do {end_dt}.")
+
+            added = 0
+            for batch in self.binance.iter_ohlcv(pair, start_dt, self.interval):
+                writer.put_history_batch(batch, self.interval)
+                added += len(batch)
 
-            ohlcv = self.binance.fetch_ohlcv(pair, start_dt)
-            if not ohlcv:
+            if not added:
                 logger.info(f"[Filter3] {symbol}: Nema novi zapisi.")
                 return {"coin": symbol, "added": 0}
 
-            db.save_history_batch(pair, ohlcv)
-            logger.info(f"[Filter3] {symbol}: Zacuvav {len(ohlcv)} novi redovi.")
-            return {"coin": symbol, "added": len(ohlcv)}
+            logger.info(f"[Filter3] {symbol}: Ispratav {added} novi redovi za zapisuvanje.")
+            return {"coin": symbol, "added": added}
 
         except Exception as e:
             logger.error(f"[Filter3] Greska pri obrabotka na {symbol}: {e}")
             return {"coin": symbol, "added": 0}
 
-        finally:
-            db.close()
-
     def process(self, coins: List[Coin], max_workers: int = 20) -> List[Dict[str, Any]]:
         from domashna1.model.coin import Coin
         coins = [Coin(symbol=c["symbol"], id=None, name=None, market_cap=None, market_cap_rank=None) if isinstance(c, dict) else c for c in coins]
@@ -62,8 +65,17 @@ class Filter3FillMissing:
         logger.info("=== Filter 3: Startuvam paralelna obrabotka za missing data ===")
         results = []
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(self._process_single, coin): coin for coin in coins}
+        db = Database()
+        try:
+            last_slots = db.get_last_slots([c.symbol.upper() for c in coins], self.interval)
+        finally:
+            db.close()
+
+        with HistoryWriter() as writer, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._process_single, coin, last_slots[coin.symbol.upper()], writer): coin
+                for coin in coins
+            }
 
             for future in as_completed(futures):
                 coin = futures[future]
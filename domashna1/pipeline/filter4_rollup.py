@@ -0,0 +1,43 @@
+import logging
+import time
+from typing import List, Any, Tuple, Sequence
+
+from domashna1.pipeline.filter_base import Filter
+from domashna1.data.db import Database
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROLLUPS: Tuple[Tuple[str, str], ...] = (("1d", "1w"), ("1d", "1M"))
+
+
+class Filter4Rollup(Filter):
+    # Gi gradi povisokite timeframe-ovi od vekje zacuvanite svecki, za
+    # analizata da gi cita gotovi namesto da povlekuva i resample-ira.
+
+    def __init__(self, rollups: Sequence[Tuple[str, str]] = DEFAULT_ROLLUPS, db_path: str = "crypto.db"):
+        self.rollups = rollups
+        self.db_path = db_path
+
+    @staticmethod
+    def _symbol(item: Any) -> str:
+        if isinstance(item, dict):
+            return (item.get("symbol") or item.get("coin")).upper()
+        return item.symbol.upper()
+
+    def process(self, coins: List[Any]) -> List[Any]:
+        logger.info("=== Filter 4: Rollup na povisoki timeframe-ovi ===")
+        symbols = sorted({self._symbol(c) for c in coins})
+
+        db = Database(self.db_path)
+        try:
+            for source, target in self.rollups:
+                start = time.perf_counter()
+                written = db.rollup_history(symbols, source, target)
+                logger.info(
+                    f"[Filter4] {source} -> {target}: {written} svecki za {len(symbols)} coins "
+                    f"vo {time.perf_counter() - start:.2f}s"
+                )
+        finally:
+            db.close()
+
+        return coins
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import List, Dict, Optional, Any, Iterable, AsyncIterator
+
+import httpx
+
+from domashna1.service.binance_client import (
+    ALL_TICKERS_WEIGHT,
+    BASE_URL,
+    KLINES_WEIGHT,
+    TICKER_WEIGHT,
+    kline_windows,
+    load_supported_pairs,
+    parse_all_daily_stats,
+    parse_kline_rows,
+    parse_daily_stats,
+    parse_klines,
+    used_weight,
+)
+from domashna1.model.interval import interval_ms
+from domashna1.service.rate_limiter import WeightLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBinanceClient:
+    # Ist interfejs kako BinanceClient, no so eden zaednicki pool na
+    # konekcii (keep-alive) i cekanje samo koga limiter-ot toa go bara.
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        cache_file: str = "binance_symbols.json",
+        max_connections: int = 20,
+        limiter: Optional[WeightLimiter] = None
+    ):
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.limiter = limiter if limiter else WeightLimiter()
+        self._http: Optional[httpx.AsyncClient] = None
+
+        logger.info("Startuvam async Binance client...")
+        self.supported_pairs = load_supported_pairs(f"{self.base_url}/exchangeInfo", cache_file)
+
+    async def __aenter__(self) -> "AsyncBinanceClient":
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections
+            ),
+            timeout=10
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _get(self, path: str, params: dict, weight: int) -> Any:
+        if self._http is None:
+            raise RuntimeError("AsyncBinanceClient mora da se koristi so 'async with'.")
+
+        for _ in range(3):
+            await self.limiter.acquire_async(weight)
+            r = await self._http.get(path, params=params)
+
+            used = used_weight(r.headers)
+            if used is not None:
+                self.limiter.sync_used_weight(used)
+
+            if r.status_code in (418, 429):
+                retry_after = float(r.headers.get("Retry-After", 1))
+                logger.warning(f"Binance limit dostignat, cekam {retry_after}s.")
+                self.limiter.backoff(retry_after)
+                continue
+
+            r.raise_for_status()
+            return r.json()
+
+        raise RuntimeError(f"Binance rate limit: neuspesno baranje kon {path}")
+
+    def is_supported(self, pair: str) -> bool:
+        return pair in self.supported_pairs
+
+    async def _fetch_window(self, symbol: str, interval: str, start_ts: int, end_ts: int, limit: int) -> List[list]:
+        params = {
+            "symbol": symbol,
+            "interval": interval,
+            "limit": limit,
+            "startTime": start_ts,
+            "endTime": end_ts
+        }
+        return await self._get("/klines", params, KLINES_WEIGHT)
+
+    def _windows(self, symbol: str, start_date: datetime, interval: str, limit: int) -> List[tuple]:
+        start_ts = int(start_date.timestamp() * 1000)
+        now_ts = int(time.time() * 1000)
+
+        # opsegot e poznat odnapred, pa prozorcite mozat da se baraat paralelno
+        windows = kline_windows(start_ts, now_ts, interval_ms(interval), limit)
+        logger.info(f"{symbol}: Povlekuvam {interval} OHLCV podatoci od {start_date} vo {len(windows)} prozorci...")
+        return windows
+
+    async def fetch_ohlcv(self, symbol: str, start_date: datetime, interval: str = "1d") -> List[dict]:
+        if not self.is_supported(symbol):
+            logger.info(f"{symbol} ne e podrzan par — skip.")
+            return []
+
+        limit = 1000
+        windows = self._windows(symbol, start_date, interval, limit)
+
+        try:
+            pages = await asyncio.gather(*(
+                self._fetch_window(symbol, interval, ws, we, limit) for ws, we in windows
+            ))
+        except Exception as e:
+            logger.warning(f"{symbol}: greska pri  fetch: {e}")
+            return []
+
+        candles = {}
+        for page in pages:
+            for row in page:
+                candles[row[0]] = row
+
+        return parse_klines(symbol, [candles[ts] for ts in sorted(candles)])
+
+    async def iter_ohlcv(
+        self,
+        symbol: str,
+        start_date: datetime,
+        interval: str = "1d",
+        ahead: int = 8
+    ) -> AsyncIterator[List[tuple]]:
+        if not self.is_supported(symbol):
+            logger.info(f"{symbol} ne e podrzan par — skip.")
+            return
+
+        limit = 1000
+        windows = iter(self._windows(symbol, start_date, interval, limit))
+
+        # najmnogu `ahead` prozorci se baraat paralelno, no se predavaat po
+        # redosled: pri greska zastanuvame, za vo bazata da ne ostane dupka
+        pending = deque()
+
+        def schedule() -> None:
+            window = next(windows, None)
+            if window is not None:
+                pending.append(asyncio.ensure_future(
+                    self._fetch_window(symbol, interval, window[0], window[1], limit)
+                ))
+
+        for _ in range(ahead):
+            schedule()
+
+        try:
+            while pending:
+                task = pending.popleft()
+                schedule()
+
+                try:
+                    page = await task
+                except Exception as e:
+                    logger.warning(f"{symbol}: greska pri  fetch: {e}")
+                    return
+
+                if page:
+                    yield parse_kline_rows(symbol, page, interval)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def fetch_daily_stats(self, symbol: str) -> Optional[Dict[str, float]]:
+        if not self.is_supported(symbol):
+            logger.info(f"{symbol} ne e vo lista na podrzani simboli.")
+            return None
+
+        try:
+            d = await self._get("/ticker/24hr", {"symbol": symbol}, TICKER_WEIGHT)
+        except Exception as e:
+            logger.warning(f"{symbol}: neuspeshno prevzemanje na daily stats: {e}")
+            return None
+
+        return parse_daily_stats(symbol, d)
+
+    async def fetch_all_daily_stats(self, pairs: Optional[Iterable[str]] = None) -> List[Dict[str, float]]:
+        try:
+            tickers = await self._get("/ticker/24hr", {}, ALL_TICKERS_WEIGHT)
+        except Exception as e:
+            logger.warning(f"Neuspeshno prevzemanje na site 24h tickeri: {e}")
+            return []
+
+        stats = parse_all_daily_stats(tickers, self.supported_pairs, pairs)
+        logger.info(f"Prevzemeni daily stats za {len(stats)} parovi so edno baranje.")
+        return stats
@@ -3,71 +3,180 @@ import logging
 import os
 import time
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
 
 import requests
 
+from domashna1.model.interval import interval_ms
+from domashna1.service.rate_limiter import WeightLimiter
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+BASE_URL = "https://api.binance.com/api/v3"
+USED_WEIGHT_HEADERS = ("X-MBX-USED-WEIGHT-1M", "X-MBX-USED-WEIGHT")
+
+# request weight spored Binance dokumentacijata
+KLINES_WEIGHT = 2
+TICKER_WEIGHT = 2
+ALL_TICKERS_WEIGHT = 80
+
+
+def load_supported_pairs(exchange_info_url: str, cache_file: str) -> set:
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, "r") as f:
+                symbols = set(json.load(f))
+            logger.info(f"Cache najden — {len(symbols)} simboli vcitani.")
+            return symbols
+        except Exception as e:
+            logger.warning(f"Problem so cache fajlot: {e} .")
+
+    try:
+        logger.info("Zemam lista na trading pairs od Binance...")
+        res = requests.get(exchange_info_url, timeout=5)
+        res.raise_for_status()
+        data = res.json()
+    except Exception as e:
+        logger.error(f"Greska pri povlekuvanje na exchange info: {e}")
+        return set()
+
+    symbols = {s["symbol"] for s in data.get("symbols", [])}
+
+    try:
+        with open(cache_file, "w") as f:
+            json.dump(list(symbols), f)
+    except Exception as e:
+        logger.warning(f"Ne moze da se zacuva cache: {e}")
+
+    logger.info(f"Zacuvani {len(symbols)} simboli vo cache.")
+    return symbols
+
+
+def kline_windows(start_ts: int, end_ts: int, step_ms: int, limit: int = 1000) -> List[Tuple[int, int]]:
+    # [start, end) podelen na prozorci od najmnogu `limit` svecki
+    span = step_ms * limit
+    return [(ts, min(ts + span, end_ts) - 1) for ts in range(start_ts, end_ts, span)]
+
+
+def used_weight(headers) -> Optional[int]:
+    for name in USED_WEIGHT_HEADERS:
+        value = headers.get(name)
+        if value is not None:
+            return int(value)
+    return None
+
+
+def parse_klines(symbol: str, data: List[list]) -> List[dict]:
+    base_symbol = symbol.replace("USDT", "")
+
+    return [
+        {
+            "symbol": base_symbol,
+            "date": datetime.utcfromtimestamp(row[0] / 1000).strftime("%Y-%m-%d"),
+            "open_time": row[0],
+            "open": float(row[1]),
+            "high": float(row[2]),
+            "low": float(row[3]),
+            "close": float(row[4]),
+            "volume": float(row[5])
+        }
+        for row in data
+    ]
+
+
+def parse_kline_rows(symbol: str, data: List[list], interval: str = "1d") -> List[tuple]:
+    # isti redovi kako parse_klines, no kako torki (symbol, slot, o, h, l, c, v)
+    # spremni za direktno zapisuvanje vo history tabelata za intervalot
+    base_symbol = symbol.replace("USDT", "")
+    step = interval_ms(interval)
+
+    return [
+        (base_symbol, row[0] // step, float(row[1]), float(row[2]), float(row[3]), float(row[4]), float(row[5]))
+        for row in data
+    ]
+
+
+def parse_all_daily_stats(
+    tickers: List[dict],
+    supported_pairs: set,
+    pairs: Optional[Iterable[str]] = None
+) -> List[Dict[str, float]]:
+    wanted = supported_pairs if pairs is None else supported_pairs.intersection(pairs)
+
+    return [
+        parse_daily_stats(t["symbol"], t)
+        for t in tickers
+        if t.get("symbol") in wanted
+    ]
+
+
+def parse_daily_stats(symbol: str, d: dict) -> Dict[str, float]:
+    return {
+        "symbol": symbol,
+        "last_price": float(d.get("lastPrice", 0)),
+        "high_24h": float(d.get("highPrice", 0)),
+        "low_24h": float(d.get("lowPrice", 0)),
+        "volume_24h": float(d.get("volume", 0)),
+        "liquidity": float(d.get("quoteVolume", 0)),
+    }
+
+
 class BinanceClient:
-    def __init__(self):
-        self.base_url = "https://api.binance.com/api/v3"
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        cache_file: str = "binance_symbols.json",
+        limiter: Optional[WeightLimiter] = None
+    ):
+        self.base_url = base_url
         self.exchange_info_url = f"{self.base_url}/exchangeInfo"
         self.klines_url = f"{self.base_url}/klines"
         self.ticker_24h_url = f"{self.base_url}/ticker/24hr"
-        self.cache_file = "binance_symbols.json"
+        self.cache_file = cache_file
+        self.limiter = limiter if limiter else WeightLimiter()
+        self.session = requests.Session()
+
+        # filtrite koristat do 20 nishki, pa pool-ot mora da gi sobere site konekcii
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=32)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
         logger.info("Startuvam Binance client...")
-        self.supported_pairs = self._load_supported_pairs()
+        self.supported_pairs = load_supported_pairs(self.exchange_info_url, self.cache_file)
 
-    def _load_supported_pairs(self) -> set:
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, "r") as f:
-                    symbols = set(json.load(f))
-                logger.info(f"Cache najden — {len(symbols)} simboli vcitani.")
-                return symbols
-            except Exception as e:
-                logger.warning(f"Problem so cache fajlot: {e} .")
+    def _get(self, url: str, params: dict, weight: int, timeout: float):
+        for _ in range(3):
+            self.limiter.acquire(weight)
+            r = self.session.get(url, params=params, timeout=timeout)
 
-        try:
-            logger.info("Zemam lista na trading pairs od Binance...")
-            res = requests.get(self.exchange_info_url, timeout=5)
-            res.raise_for_status()
-            data = res.json()
-        except Exception as e:
-            logger.error(f"Greska pri povlekuvanje na exchange info: {e}")
-            return set()
+            used = used_weight(r.headers)
+            if used is not None:
+                self.limiter.sync_used_weight(used)
 
-        symbols = {s["symbol"] for s in data.get("symbols", [])}
+            if r.status_code in (418, 429):
+                retry_after = float(r.headers.get("Retry-After", 1))
+                logger.warning(f"Binance limit dostignat, cekam {retry_after}s.")
+                self.limiter.backoff(retry_after)
+                continue
 
-        try:
-            with open(self.cache_file, "w") as f:
-                json.dump(list(symbols), f)
-        except Exception as e:
-            logger.warning(f"Ne moze da se zacuva cache: {e}")
+            r.raise_for_status()
+            return r.json()
 
-        logger.info(f"Zacuvani {len(symbols)} simboli vo cache.")
-        return symbols
+        raise RuntimeError(f"Binance rate limit: neuspesno baranje kon {url}")
 
     def is_supported(self, pair: str) -> bool:
         return pair in self.supported_pairs
 
-    def fetch_ohlcv(self, symbol: str, start_date: datetime) -> List[dict]:
-        if not self.is_supported(symbol):
-            logger.info(f"{symbol} ne e podrzan par — skip.")
-            return []
-
-        interval = "1d"
+    def _iter_kline_pages(self, symbol: str, start_date: datetime, interval: str) -> Iterator[List[list]]:
+        step = interval_ms(interval)
         limit = 1000
-        results = []
 
         start_ts = int(start_date.timestamp() * 1000)
         now_ts = int(time.time() * 1000)
 
-        logger.info(f"{symbol}: Povlekuvam OHLCV podatoci od {start_date.date()}...")
+        logger.info(f"{symbol}: Povlekuvam {interval} OHLCV podatoci od {start_date}...")
 
         while start_ts < now_ts:
             params = {
@@ -78,36 +187,35 @@ class BinanceClient:
             }
 
             try:
-                r = requests.get(self.klines_url, params=params, timeout=7)
-                r.raise_for_status()
+                data = self._get(self.klines_url, params, KLINES_WEIGHT, timeout=7)
             except Exception as e:
                 logger.warning(f"{symbol}: greska pri  fetch: {e}")
                 break
 
-            data = r.json()
             if not data:
                 break
 
-            base_symbol = symbol.replace("USDT", "")
+            yield data
 
-            for row in data:
-                ts = row[0]
-                date_str = datetime.utcfromtimestamp(ts / 1000).strftime("%Y-%m-%d")
+            last_ts = data[-1][0]
+            start_ts = last_ts + step
 
-                results.append({
-                    "symbol": base_symbol,
-                    "date": date_str,
-                    "open": float(row[1]),
-                    "high": float(row[2]),
-                    "low": float(row[3]),
-                    "close": float(row[4]),
-                    "volume": float(row[5])
-                })
+    def iter_ohlcv(self, symbol: str, start_date: datetime, interval: str = "1d") -> Iterator[List[tuple]]:
+        if not self.is_supported(symbol):
+            logger.info(f"{symbol} ne e podrzan par — skip.")
+            return
 
-            last_ts = data[-1][0]
-            start_ts = last_ts + 86_400_000
+        for data in self._iter_kline_pages(symbol, start_date, interval):
+            yield parse_kline_rows(symbol, data, interval)
 
-            time.sleep(0.25)
+    def fetch_ohlcv(self, symbol: str, start_date: datetime, interval: str = "1d") -> List[dict]:
+        if not self.is_supported(symbol):
+            logger.info(f"{symbol} ne e podrzan par — skip.")
+            return []
+
+        results = []
+        for data in self._iter_kline_pages(symbol, start_date, interval):
+            results.extend(parse_klines(symbol, data))
 
         return results
 
@@ -117,18 +225,20 @@ class BinanceClient:
             return None
 
         try:
-            r = requests.get(self.ticker_24h_url, params={"symbol": symbol}, timeout=5)
-            r.raise_for_status()
+            d = self._get(self.ticker_24h_url, {"symbol": symbol}, TICKER_WEIGHT, timeout=5)
         except Exception as e:
             logger.warning(f"{symbol}: neuspeshno prevzemanje na daily stats: {e}")
             return None
 
-        d = r.json()
-        return {
-            "symbol": symbol,
-            "last_price": float(d.get("lastPrice", 0)),
-            "high_24h": float(d.get("highPrice", 0)),
-            "low_24h": float(d.get("lowPrice", 0)),
-            "volume_24h": float(d.get("volume", 0)),
-            "liquidity": float(d.get("quoteVolume", 0)),
-        }
+        return parse_daily_stats(symbol, d)
+
+    def fetch_all_daily_stats(self, pairs: Optional[Iterable[str]] = None) -> List[Dict[str, float]]:
+        try:
+            tickers = self._get(self.ticker_24h_url, {}, ALL_TICKERS_WEIGHT, timeout=10)
+        except Exception as e:
+            logger.warning(f"Neuspeshno prevzemanje na site 24h tickeri: {e}")
+            return []
+
+        stats = parse_all_daily_stats(tickers, self.supported_pairs, pairs)
+        logger.info(f"Prevzemeni daily stats za {len(stats)} parovi so edno baranje.")
+        return stats
@@ -0,0 +1,131 @@
+import argparse
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from domashna1.model.interval import interval_ms
+
+# Lokalen stub na Binance REST API za testiranje na klientite bez mreza:
+#   python -m domashna1.service.binance_stub --port 8900
+#   BinanceClient(base_url="http://127.0.0.1:8900/api/v3", cache_file="stub_symbols.json")
+
+DAY_MS = 86_400_000
+WEIGHTS = {"/api/v3/klines": 2, "/api/v3/ticker/24hr": 2, "/api/v3/exchangeInfo": 20}
+
+
+def synthetic_price(symbol: str, ts: int) -> float:
+    base = 10 + sum(map(ord, symbol)) % 90
+    day = ts // DAY_MS
+    return base * (1 + 0.1 * ((day * 7919) % 100) / 100)
+
+
+class StubState:
+    def __init__(self, symbols, listed_days: int):
+        self.symbols = symbols
+        self.listed_from = (int(time.time() * 1000) // DAY_MS - listed_days) * DAY_MS
+        self.lock = threading.Lock()
+        self.window = int(time.time() // 60)
+        self.used = 0
+        self.requests = 0
+
+    def charge(self, weight: int) -> int:
+        with self.lock:
+            minute = int(time.time() // 60)
+            if minute != self.window:
+                self.window, self.used = minute, 0
+            self.used += weight
+            self.requests += 1
+            return self.used
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: StubState = None
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload, used: int) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-MBX-USED-WEIGHT-1M", str(used))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        used = self.state.charge(WEIGHTS.get(url.path, 1))
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if url.path == "/api/v3/exchangeInfo":
+            return self._send(200, {"symbols": [{"symbol": s} for s in self.state.symbols]}, used)
+
+        if url.path == "/api/v3/klines":
+            return self._send(200, self._klines(params), used)
+
+        if url.path == "/api/v3/ticker/24hr":
+            symbols = [params["symbol"]] if "symbol" in params else self.state.symbols
+            tickers = [self._ticker(s) for s in symbols if s in self.state.symbols]
+            return self._send(200, tickers[0] if "symbol" in params else tickers, used)
+
+        self._send(404, {"code": -1, "msg": "not found"}, used)
+
+    def _klines(self, params: dict) -> list:
+        symbol = params["symbol"]
+        if symbol not in self.state.symbols:
+            return []
+
+        step = interval_ms(params.get("interval", "1d"))
+        limit = min(int(params.get("limit", 500)), 1000)
+        now = int(time.time() * 1000)
+        start = max(int(params.get("startTime", self.state.listed_from)), self.state.listed_from)
+        start = -(-start // step) * step
+        end = min(int(params.get("endTime", now)), now)
+
+        rows = []
+        ts = start
+        while ts <= end and len(rows) < limit:
+            p = synthetic_price(symbol, ts)
+            rows.append([ts, str(p), str(p * 1.02), str(p * 0.98), str(p * 1.01), "1000.0",
+                         ts + step - 1, "0", 0, "0", "0", "0"])
+            ts += step
+        return rows
+
+    def _ticker(self, symbol: str) -> dict:
+        p = synthetic_price(symbol, int(time.time() * 1000))
+        return {
+            "symbol": symbol,
+            "lastPrice": str(p),
+            "highPrice": str(p * 1.05),
+            "lowPrice": str(p * 0.95),
+            "volume": "1000.0",
+            "quoteVolume": str(p * 1000),
+        }
+
+
+def serve(port: int = 8900, coins: int = 50, listed_days: int = 3650, latency: float = 0.0) -> ThreadingHTTPServer:
+    symbols = [f"C{i}USDT" for i in range(coins)] + ["BTCUSDT", "ETHUSDT"]
+    handler = type("Handler", (StubHandler,), {"state": StubState(symbols, listed_days), "latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lokalen Binance stub server")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--coins", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    srv = serve(args.port, args.coins, latency=args.latency)
+    print(f"Binance stub slusa na http://127.0.0.1:{args.port}/api/v3")
+    srv.serve_forever()
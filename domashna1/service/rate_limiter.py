@@ -0,0 +1,47 @@
+import asyncio
+import threading
+import time
+
+
+class WeightLimiter:
+    # Token bucket za Binance request weight (default 6000 / minuta).
+    # Rezervacijata moze da odi vo minus, pa cekanjeto raste so brojot na cekaci.
+
+    def __init__(self, weight_per_minute: int = 6000, safety: float = 0.9):
+        self.capacity = weight_per_minute * safety
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, weight: int) -> float:
+        with self.lock:
+            self._refill()
+            self.tokens -= weight
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self, weight: int = 1) -> None:
+        wait = self.reserve(weight)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, weight: int = 1) -> None:
+        wait = self.reserve(weight)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def sync_used_weight(self, used_weight: int) -> None:
+        # X-MBX-USED-WEIGHT-1M e vistinskata potrosuvacka na serverot
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, self.capacity - used_weight)
+
+    def backoff(self, seconds: float) -> None:
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, -seconds * self.rate)
@@ -0,0 +1,90 @@
+import sqlite3
+import threading
+import time
+
+from domashna1.data.db import COINS_ORDER_KEY, COINS_VERSION_KEY
+from domashna3.db_pool import DB_PATH, connect_readonly
+
+
+class CatalogSnapshot:
+    def __init__(self, version, rows):
+        # rows: (id, symbol, name, market_cap, market_cap_rank), vo redosled po rank (bez rank na kraj)
+        self.version = version
+        self.rows = rows
+        self.by_id = {r[0]: r for r in rows}
+        self.by_symbol = {}
+        for r in rows:
+            if r[1]:
+                self.by_symbol.setdefault(r[1].upper(), r)
+        self.by_market_cap = sorted(
+            (r for r in rows if r[3] is not None), key=lambda r: r[3], reverse=True
+        )
+
+    def top(self, limit=300):
+        return [(r[0], r[1], r[2]) for r in self.rows[:limit]]
+
+
+class CoinCatalog:
+    def __init__(self, path=DB_PATH, check_interval=5.0):
+        # sopstvena konekcija, ne od pool-ot: baranjeto vekje drzi konekcija od get_db,
+        # pa vgnezden acquire() bi cekal na pool sto nikoj ne go osloboduva
+        self.path = path
+        self._conn = None
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _version(self, conn):
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (COINS_VERSION_KEY,)).fetchone()
+        except sqlite3.OperationalError:
+            # baza bez meta tabela (pred prvoto pustanje na pipeline-ot)
+            return 0
+        return row[0] if row else 0
+
+    def _load(self, conn, version):
+        # ist redosled kako listanjeto na /cryptos: coins bez rank na kraj
+        rows = conn.execute(f"""
+            SELECT id, symbol, name, market_cap, market_cap_rank
+            FROM coins
+            ORDER BY {COINS_ORDER_KEY}, id
+        """).fetchall()
+        return CatalogSnapshot(version, rows)
+
+    def get(self):
+        # verzijata se proveruva najmnogu ednas na check_interval sekundi
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return self._snapshot
+
+            if self._conn is None:
+                self._conn = connect_readonly(self.path)
+
+            version = self._version(self._conn)
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = self._load(self._conn, version)
+
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+catalog = CoinCatalog()
+
+
+def get_catalog():
+    return catalog.get()
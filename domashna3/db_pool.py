@@ -0,0 +1,122 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from fastapi import HTTPException
+
+DB_PATH = "crypto.db"
+
+# 0 = bez pool, nova konekcija po baranje (kako porano); korisno za load_test sporedba.
+# 40 = anyio thread limiter na Starlette: sekoja sync ruta moze da ima konekcija bez cekanje
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "40"))
+
+# sekundi za Retry-After koga pool-ot e iscrpen
+RETRY_AFTER = 1
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+def connect_readonly(path=DB_PATH, mmap_size=256 * 1024 * 1024, cached_statements=256):
+    conn = sqlite3.connect(
+        f"file:{path}?mode=ro",
+        uri=True,
+        check_same_thread=False,
+        cached_statements=cached_statements
+    )
+    conn.execute("PRAGMA query_only = ON")
+    conn.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+    conn.execute("PRAGMA cache_size = -16384")
+    return conn
+
+
+class ReadOnlyPool:
+    def __init__(self, path=DB_PATH, size=POOL_SIZE, mmap_size=256 * 1024 * 1024, cached_statements=256, timeout=10):
+        self.path = path
+        self.size = size
+        self.mmap_size = mmap_size
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+
+        # LIFO: posledno vratenata konekcija ima najtopol page cache
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        return connect_readonly(self.path, self.mmap_size, self.cached_statements)
+
+    def acquire(self):
+        if self.size <= 0:
+            return self._connect()
+
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+
+        if create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeout(f"Nema slobodna konekcija vo pool-ot ({self.size}) po {self.timeout}s")
+
+    def release(self, conn):
+        if self.size <= 0:
+            conn.close()
+            return
+
+        # otvorena transakcija od prekinato baranje ne smee da ostane na konekcijata
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._created = 0
+
+
+pool = ReadOnlyPool()
+
+
+def get_db():
+    # FastAPI dependency: konekcijata se vrakja vo pool-ot po odgovorot
+    try:
+        conn = pool.acquire()
+    except PoolTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(RETRY_AFTER)})
+
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
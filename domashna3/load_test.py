@@ -0,0 +1,60 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import threading
+import time
+
+import httpx
+
+ENDPOINTS = ["/api/coins", "/api/tech?coin=bitcoin", "/api/history/bitcoin?points=500", "/cryptos?page=3", "/grafici", "/tech-analysis"]
+
+
+def run(client, path, threads, seconds):
+    done = [0] * threads
+    errors = [0] * threads
+    stop = time.perf_counter() + seconds
+
+    def worker(i):
+        while time.perf_counter() < stop:
+            r = client.get(path)
+            if r.status_code == 200:
+                done[i] += 1
+            else:
+                errors[i] += 1
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    return sum(done) / seconds, sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requests/sec po endpoint za domashna3")
+    parser.add_argument("--url", help="adresa na pusten server; bez nea aplikacijata se vcituva vo istiot proces")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("endpoints", nargs="*", default=ENDPOINTS)
+    args = parser.parse_args()
+
+    if args.url:
+        client = httpx.Client(base_url=args.url, limits=httpx.Limits(max_connections=args.threads))
+    else:
+        # DB_POOL_SIZE=0 ja vrakja starata konekcija-po-baranje, za sporedba
+        from fastapi.testclient import TestClient
+        from domashna3.main import app
+        client = TestClient(app)
+
+    print(f"DB_POOL_SIZE={os.environ.get('DB_POOL_SIZE', 'default')}, threads={args.threads}, {args.seconds}s po endpoint")
+    with client:
+        for path in args.endpoints:
+            client.get(path)
+            rps, errors = run(client, path, args.threads, args.seconds)
+            print(f"{path:<24} {rps:8.1f} req/s  greski: {errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
-from fastapi import FastAPI, Request, Body
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, Body, Depends, HTTPException
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
@@ -10,31 +12,32 @@ from datetime import datetime, timedelta
 
 import requests
 
+from domashna1.data.db import COINS_ORDER_KEY, day_to_date
+
+from domashna3.catalog import CatalogSnapshot, catalog as coin_catalog, get_catalog
+from domashna3.db_pool import get_db, pool
+from domashna3.price_history import MAX_POINTS, MODES, columnar, downsample, history_symbol, history_version, load_candles
+from domashna3.response_cache import cached_json
+
 TECHNICAL_URL = "http://technical:8000/tech-analysis"
 SENTIMENT_URL = "http://sentiment:8000/sentiment"
 LSTM_URL = "http://lstm:8000/lstm"
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    pool.close()
+    coin_catalog.close()
 
-app.mount("/static", StaticFiles(directory="domashna3/static"), name="static")
-templates = Jinja2Templates(directory="domashna3/templates")
 
-DB_PATH = "crypto.db"
+app = FastAPI(lifespan=lifespan)
 
+app.mount("/static", StaticFiles(directory="domashna3/static"), name="static")
+templates = Jinja2Templates(directory="domashna3/templates")
 
-def get_all_coins(limit=300):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT id, symbol, name
-        FROM coins
-        ORDER BY market_cap_rank
-        LIMIT ?
-    """, (limit,))
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+def get_all_coins(catalog: CatalogSnapshot, limit=300):
+    return catalog.top(limit)
 
 
 
@@ -50,39 +53,28 @@ def about(request: Request):
 
 
 @app.get("/api/coins")
-def api_coins():
-    coins = get_all_coins(300)
-    return [
-        {"id": c[0], "symbol": c[1], "name": c[2]}
-        for c in coins
-    ]
+def api_coins(request: Request, catalog: CatalogSnapshot = Depends(get_catalog)):
+    def build():
+        coins = get_all_coins(catalog, 300)
+        return [
+            {"id": c[0], "symbol": c[1], "name": c[2]}
+            for c in coins
+        ]
+
+    # se gradi odnovo samo koga pipeline-ot ke ja smeni verzijata na katalogot
+    return cached_json(request, ("coins", 300), build, version=catalog.version)
 
 
 
 @app.get("/grafici", response_class=HTMLResponse)
-def grafici(request: Request):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT name, market_cap
-        FROM coins
-        WHERE market_cap IS NOT NULL
-        ORDER BY market_cap DESC
-        LIMIT 10
-    """)
-    top = cur.fetchall()
-
-    cur.execute("""
-        SELECT id, symbol, name, market_cap
-        FROM coins
-        WHERE market_cap IS NOT NULL
-        ORDER BY market_cap_rank
-        LIMIT 100
-    """)
-    all_cryptos = cur.fetchall()
-
-    conn.close()
+def grafici(request: Request, catalog: CatalogSnapshot = Depends(get_catalog)):
+    top = [(r[2], r[3]) for r in catalog.by_market_cap[:10]]
+
+    all_cryptos = [
+        (r[0], r[1], r[2], r[3])
+        for r in catalog.rows
+        if r[3] is not None
+    ][:100]
 
     return templates.TemplateResponse(
         "grafici.html",
@@ -93,53 +85,78 @@ def grafici(request: Request):
             "all_cryptos": all_cryptos
         }
     )
+
+
+COINS_PAGE_SQL = f"""
+    SELECT id, symbol, name, market_cap, market_cap_rank, {COINS_ORDER_KEY}
+    FROM coins
+"""
+
+
+def encode_cursor(row):
+    return f"{row[5]}:{row[0]}" if row else None
+
+
+def decode_cursor(cursor):
+    rank, _, coin_id = cursor.partition(":")
+    try:
+        return int(rank), coin_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Nevaliden kursor")
+
+
+def fetch_coins_page(db, limit, after=None, before=None, offset=0):
+    # keyset paginacija po (rank, id): dlabokite strani se isto evtini kako prvata
+    # (>= ... OR ... namesto row value sporedba za SQLite da go koristi indeksot kako SEARCH)
+    if after:
+        rank, coin_id = decode_cursor(after)
+        rows = db.execute(
+            COINS_PAGE_SQL + f"WHERE {COINS_ORDER_KEY} >= ? AND ({COINS_ORDER_KEY} > ? OR id > ?) ORDER BY {COINS_ORDER_KEY}, id LIMIT ?",
+            (rank, rank, coin_id, limit)
+        ).fetchall()
+    elif before:
+        rank, coin_id = decode_cursor(before)
+        rows = db.execute(
+            COINS_PAGE_SQL + f"WHERE {COINS_ORDER_KEY} <= ? AND ({COINS_ORDER_KEY} < ? OR id < ?) ORDER BY {COINS_ORDER_KEY} DESC, id DESC LIMIT ?",
+            (rank, rank, coin_id, limit)
+        ).fetchall()[::-1]
+    else:
+        # direkten link do ?page=N bez kursor
+        rows = db.execute(
+            COINS_PAGE_SQL + f"ORDER BY {COINS_ORDER_KEY}, id LIMIT ? OFFSET ?",
+            (limit, offset)
+        ).fetchall()
+    return rows
+
+
 @app.get("/cryptos", response_class=HTMLResponse)
 def cryptos(
     request: Request,
     filter_id: str | None = None,
-    page: int = 1
+    page: int = 1,
+    after: str | None = None,
+    before: str | None = None,
+    db: sqlite3.Connection = Depends(get_db),
+    catalog: CatalogSnapshot = Depends(get_catalog)
 ):
     PER_PAGE = 10
-    offset = (page - 1) * PER_PAGE
-
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+    page = max(1, page)
 
-    cur.execute("""
-        SELECT id, name
-        FROM coins
-        ORDER BY market_cap_rank
-        LIMIT 300
-    """)
-    all_cryptos = cur.fetchall()
+    all_cryptos = [(c[0], c[2]) for c in get_all_coins(catalog, 300)]
 
+    # brojot na coins doaga od katalogot, ne od COUNT(*) po baranje
     if filter_id:
-        cur.execute(
-            "SELECT COUNT(*) FROM coins WHERE id = ?",
-            (filter_id,)
-        )
+        total = 1 if filter_id in catalog.by_id else 0
     else:
-        cur.execute("SELECT COUNT(*) FROM coins")
-
-    total = cur.fetchone()[0]
+        total = len(catalog.rows)
     total_pages = max(1, (total + PER_PAGE - 1) // PER_PAGE)
 
     if filter_id:
-        cur.execute("""
-            SELECT id, symbol, name, market_cap, market_cap_rank
-            FROM coins
-            WHERE id = ?
-        """, (filter_id,))
+        rows = db.execute(COINS_PAGE_SQL + "WHERE id = ?", (filter_id,)).fetchall()
     else:
-        cur.execute("""
-            SELECT id, symbol, name, market_cap, market_cap_rank
-            FROM coins
-            ORDER BY market_cap_rank
-            LIMIT ? OFFSET ?
-        """, (PER_PAGE, offset))
+        rows = fetch_coins_page(db, PER_PAGE, after, before, (page - 1) * PER_PAGE)
 
-    cryptos = cur.fetchall()
-    conn.close()
+    cryptos = [r[:5] for r in rows]
 
     return templates.TemplateResponse(
         "cryptos.html",
@@ -149,15 +166,41 @@ def cryptos(
             "all_cryptos": all_cryptos,
             "selected": filter_id,
             "page": page,
-            "total_pages": total_pages
+            "total_pages": total_pages,
+            "prev_cursor": encode_cursor(rows[0]) if rows else None,
+            "next_cursor": encode_cursor(rows[-1]) if rows else None
         }
     )
 
 
+@app.get("/api/cryptos")
+def cryptos_api(
+    request: Request,
+    limit: int = 50,
+    after: str | None = None,
+    db: sqlite3.Connection = Depends(get_db),
+    catalog: CatalogSnapshot = Depends(get_catalog)
+):
+    limit = min(max(1, limit), 500)
+
+    def build():
+        rows = fetch_coins_page(db, limit, after)
+        return {
+            "total": len(catalog.rows),
+            "items": [
+                {"id": r[0], "symbol": r[1], "name": r[2], "market_cap": r[3], "market_cap_rank": r[4]}
+                for r in rows
+            ],
+            "next": encode_cursor(rows[-1]) if len(rows) == limit else None
+        }
+
+    return cached_json(request, ("cryptos", limit, after), build, version=catalog.version)
+
+
 
 @app.get("/lstm", response_class=HTMLResponse)
-def lstm_view(request: Request, coin: str | None = None):
-    coins_raw = get_all_coins()
+def lstm_view(request: Request, coin: str | None = None, catalog: CatalogSnapshot = Depends(get_catalog)):
+    coins_raw = get_all_coins(catalog)
 
     all_coins = [
         {"id": c[0], "symbol": c[1], "name": c[2]}
@@ -180,8 +223,42 @@ def lstm_view(request: Request, coin: str | None = None):
 
 
 
+@app.get("/api/history/{coin}")
+def history_api(
+    request: Request,
+    coin: str,
+    start: str | None = None,
+    end: str | None = None,
+    points: int = 500,
+    mode: str = "ohlc",
+    db: sqlite3.Connection = Depends(get_db),
+    catalog: CatalogSnapshot = Depends(get_catalog)
+):
+    if mode not in MODES:
+        raise HTTPException(status_code=400, detail=f"Nepoznat mode '{mode}'")
+    # LTTB gi zadrzuva prvata i poslednata tocka, pa mu trebaat barem 3
+    points = min(max(3 if mode == "lttb" else 2, points), MAX_POINTS)
+    symbol = history_symbol(catalog, coin)
+
+    def build():
+        try:
+            cols = load_candles(db, symbol, start, end)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Nevaliden datum (YYYY-MM-DD)")
+        if not len(cols["t"]):
+            raise HTTPException(status_code=404, detail=f"Nema istorija za {symbol}")
+        return columnar(symbol, downsample(cols, points, mode), len(cols["t"]), mode)
+
+    key = ("history", symbol, start, end, points, mode)
+    return cached_json(request, key, build, version=history_version(db), max_age=300)
+
+
 @app.post("/lstm/predict")
-def lstm_predict(payload: dict = Body(...)):
+def lstm_predict(
+    payload: dict = Body(...),
+    db: sqlite3.Connection = Depends(get_db),
+    catalog: CatalogSnapshot = Depends(get_catalog)
+):
     horizon = int(payload.get("horizon_value", 7))
     coin_id = payload.get("coin_id", "bitcoin")
 
@@ -189,25 +266,36 @@ def lstm_predict(payload: dict = Body(...)):
     rnd = random.Random(seed)
 
     history_days = 30
-    history_dates = [
-        (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
-        for i in reversed(range(history_days))
-    ]
+    cols = load_candles(db, history_symbol(catalog, coin_id), last=history_days)
+    closes = cols["c"]
+
+    if len(closes):
+        # vistinskata istorija od bazata; predikciite ostanuvaat placeholder do LSTM servisot
+        last_day = datetime(1970, 1, 1) + timedelta(days=int(cols["t"][-1]))
+        history_dates = [day_to_date(int(d)) for d in cols["t"]]
+        prices = [round(float(p), 8) for p in closes]
+    else:
+        last_day = datetime.now()
+        history_dates = [
+            (last_day - timedelta(days=i)).strftime("%Y-%m-%d")
+            for i in reversed(range(history_days))
+        ]
 
-    prices = [rnd.randint(20000, 50000)]
-    for _ in range(history_days - 1):
-        prices.append(prices[-1] + rnd.randint(-500, 500))
+        prices = [rnd.randint(20000, 50000)]
+        for _ in range(history_days - 1):
+            prices.append(prices[-1] + rnd.randint(-500, 500))
 
     future_dates = [
-        (datetime.now() + timedelta(days=i)).strftime("%Y-%m-%d")
+        (last_day + timedelta(days=i)).strftime("%Y-%m-%d")
         for i in range(1, horizon + 1)
     ]
 
+    # cekorite se relativni za da odgovaraat na cenata na koj bilo coin
     last_price = prices[-1]
     predictions = []
     for _ in range(horizon):
-        last_price += rnd.randint(-400, 600)
-        predictions.append(last_price)
+        last_price *= 1 + rnd.uniform(-0.012, 0.018)
+        predictions.append(round(last_price, 8))
 
     return {
         "symbol": coin_id,
@@ -226,7 +314,11 @@ def sentiment_view(request: Request):
 
 
 @app.get("/api/sentiment")
-def sentiment_api(coin: str):
+def sentiment_api(request: Request, coin: str):
+    return cached_json(request, ("sentiment", coin.upper()), lambda: build_sentiment(coin), max_age=300)
+
+
+def build_sentiment(coin: str):
     seed = int(hashlib.md5(coin.upper().encode()).hexdigest(), 16)
     rnd = random.Random(seed)
 
@@ -242,8 +334,8 @@ def sentiment_api(coin: str):
 
 
 @app.get("/on-chain", response_class=HTMLResponse)
-def onchain_view(request: Request):
-    coins_raw = get_all_coins(300)
+def onchain_view(request: Request, catalog: CatalogSnapshot = Depends(get_catalog)):
+    coins_raw = get_all_coins(catalog, 300)
 
     all_cryptos = [
         {"id": c[0], "symbol": c[1], "name": c[2]}
@@ -261,7 +353,11 @@ def onchain_view(request: Request):
 
 
 @app.get("/api/onchain")
-def onchain_api(coin: str):
+def onchain_api(request: Request, coin: str):
+    return cached_json(request, ("onchain", coin.lower()), lambda: build_onchain(coin), max_age=300)
+
+
+def build_onchain(coin: str):
     seed = int(hashlib.md5(coin.lower().encode()).hexdigest(), 16)
     rnd = random.Random(seed)
 
@@ -290,7 +386,30 @@ def onchain_api(coin: str):
 
 
 @app.get("/api/tech")
-def tech_api(coin: str):
+def tech_api(
+    request: Request,
+    coin: str,
+    db: sqlite3.Connection = Depends(get_db),
+    catalog: CatalogSnapshot = Depends(get_catalog)
+):
+    symbol = history_symbol(catalog, coin)
+    return cached_json(
+        request, ("tech", symbol), lambda: build_tech(symbol, load_candles(db, symbol, last=60)),
+        version=history_version(db), max_age=300
+    )
+
+
+def build_tech(coin: str, cols=None):
+    if cols is not None and len(cols["c"]) >= 20:
+        # poslednite 5 dena od vistinskite close ceni
+        closes = cols["c"][-60:].tolist()
+        return {
+            "labels": [day_to_date(int(d)) for d in cols["t"][-5:]],
+            "sma": [round(v, 8) for v in sma_series(closes)[-5:]],
+            "ema": [round(v, 8) for v in ema_series(closes, 5)[-5:]],
+            "rsi": round(rsi_series(closes, 14)[-1], 2)
+        }
+
     seed = int(hashlib.md5(coin.lower().encode()).hexdigest(), 16)
     rnd = random.Random(seed)
 
@@ -309,8 +428,8 @@ def tech_api(coin: str):
 
 
 @app.get("/tech-analysis", response_class=HTMLResponse)
-def tech_analysis(request: Request):
-    coins_raw = get_all_coins(300)
+def tech_analysis(request: Request, catalog: CatalogSnapshot = Depends(get_catalog)):
+    coins_raw = get_all_coins(catalog, 300)
 
     all_cryptos = [
         {"id": c[0], "symbol": c[1], "name": c[2]}
@@ -0,0 +1,123 @@
+import sqlite3
+
+import numpy as np
+
+from domashna1.data.db import HISTORY_VERSION_KEY, date_to_day, day_to_date
+
+MAX_POINTS = 5000
+MODES = ("ohlc", "lttb")
+
+# kolonite vo odgovorot; t e den od 1970-01-01 (kako vo history tabelata)
+COLUMNS = ("t", "o", "h", "l", "c", "v")
+
+# znacajni cifri za cenite vo JSON; polnata float preciznost go dupli odgovorot
+DIGITS = 7
+
+
+def history_symbol(catalog, coin: str) -> str:
+    # coin moze da bide id ("bitcoin") ili simbol ("BTC"); history e po simbol
+    row = catalog.by_id.get(coin) or catalog.by_symbol.get(coin.upper())
+    return (row[1] if row and row[1] else coin).upper()
+
+
+def history_version(db) -> int:
+    # sekoe zapisuvanje vo history (i prepisuvanjeto na otvorenata sveka) ja zgolemuva verzijata
+    try:
+        row = db.execute("SELECT value FROM meta WHERE key = ?", (HISTORY_VERSION_KEY,)).fetchone()
+    except sqlite3.OperationalError:
+        # baza bez meta tabela
+        return 0
+    return row[0] if row else 0
+
+
+def load_candles(db, symbol: str, start: str | None = None, end: str | None = None, last: int | None = None):
+    # start/end se ISO datumi; end ne e vklucen (kako kaj technical.history_source)
+    # last: samo poslednite N sveki, citani nanazad po primarniot kluc
+    sql = "SELECT day, open, high, low, close, volume FROM history WHERE symbol = ?"
+    params = [symbol]
+    if start:
+        sql += " AND day >= ?"
+        params.append(date_to_day(start))
+    if end:
+        sql += " AND day < ?"
+        params.append(date_to_day(end))
+
+    if last is not None:
+        rows = db.execute(sql + " ORDER BY day DESC LIMIT ?", (*params, last)).fetchall()[::-1]
+    else:
+        rows = db.execute(sql + " ORDER BY day", params).fetchall()
+    data = np.array(rows, dtype=np.float64).reshape(-1, 6)
+    return {name: data[:, i] for i, name in enumerate(COLUMNS)}
+
+
+def bucket_ohlcv(cols, points: int):
+    # min-max bucketing: sekoj bucket e edna sveca (prv open, max high, min low, posleden close)
+    n = len(cols["t"])
+    if n <= points:
+        return cols
+
+    starts = np.unique(np.linspace(0, n, points + 1).astype(np.int64)[:-1])
+    ends = np.append(starts[1:], n) - 1
+
+    return {
+        "t": cols["t"][starts],
+        "o": cols["o"][starts],
+        "h": np.fmax.reduceat(cols["h"], starts),
+        "l": np.fmin.reduceat(cols["l"], starts),
+        "c": cols["c"][ends],
+        "v": np.add.reduceat(np.nan_to_num(cols["v"]), starts),
+    }
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    # Largest-Triangle-Three-Buckets: gi zadrzuva tockite sto najmnogu ja oblikuvaat linijata
+    n = len(x)
+    if n <= points or points < 3:
+        return np.arange(n)
+
+    y = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(y).any() else 0.0, y)
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+
+    out = np.empty(points, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    prev = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+
+        area = np.abs(
+            (x[prev] - avg_x) * (y[lo:hi] - y[prev])
+            - (x[prev] - x[lo:hi]) * (avg_y - y[prev])
+        )
+        prev = lo + int(np.argmax(area))
+        out[i + 1] = prev
+    return out
+
+
+def downsample(cols, points: int, mode: str = "ohlc"):
+    if mode == "lttb":
+        # linija od close cenite: ostanatite koloni ne se prakjaat
+        idx = lttb_indices(cols["t"], cols["c"], points)
+        return {"t": cols["t"][idx], "c": cols["c"][idx]}
+    return bucket_ohlcv(cols, points)
+
+
+def _compact(values: np.ndarray):
+    return [float(f"{v:.{DIGITS}g}") for v in values.tolist()]
+
+
+def columnar(symbol: str, cols, total: int, mode: str):
+    # kompakten JSON: edna lista po kolona namesto lista od objekti po sveca
+    t = cols["t"].astype(np.int64)
+    return {
+        "symbol": symbol,
+        "mode": mode,
+        "total": total,
+        "points": len(t),
+        "from": day_to_date(int(t[0])) if len(t) else None,
+        "to": day_to_date(int(t[-1])) if len(t) else None,
+        "t": t.tolist(),
+        **{name: _compact(cols[name]) for name in COLUMNS[1:] if name in cols},
+    }
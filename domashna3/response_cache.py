@@ -0,0 +1,58 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import orjson
+from fastapi import Request, Response
+
+JSON_TYPE = "application/json"
+
+
+class ResponseCache:
+    # gotovi JSON bajti i ETag po kluc; verzijata kazuva dali podatocite pod nego se smeneti
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                return entry[1], entry[2]
+
+        body = orjson.dumps(build())
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+        with self._lock:
+            self._entries[key] = (version, body, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body, etag
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip() for tag in header.split(","))
+
+
+def cached_json(request: Request, key, build, version=0, max_age=60) -> Response:
+    body, etag = response_cache.get(key, version, build)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=JSON_TYPE, headers=headers)
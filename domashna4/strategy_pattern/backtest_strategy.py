@@ -0,0 +1,35 @@
+import pandas as pd
+
+from domashna4.strategy_pattern.strategy import AnalysisStrategy
+from technical.backtest import backtest
+from technical.tech_analiza import SignalConfig, add_indicators, generate_signals
+
+class BacktestStrategy(AnalysisStrategy):
+    def __init__(self, fee=0.001, slippage=0.0005, cfg=SignalConfig()):
+        self.fee = fee
+        self.slippage = slippage
+        self.cfg = cfg
+
+    def _signals(self, data):
+        if isinstance(data, pd.DataFrame):
+            if "SIGNAL" in data.columns:
+                return data
+            return generate_signals(add_indicators(data), self.cfg)
+
+        # samo lista od ceni: High/Low se isti kako Close
+        prices = [float(p) for p in data]
+        frame = pd.DataFrame({"Open": prices, "High": prices, "Low": prices, "Close": prices, "Volume": 0.0})
+        return generate_signals(add_indicators(frame), self.cfg)
+
+    def analyze(self, data):
+        if len(data) < 2:
+            return "Backtest: not enough data"
+
+        result = backtest(self._signals(data), fee=self.fee, slippage=self.slippage)
+        stats = result.stats.iloc[0]
+
+        return (
+            f"Backtest: return = {round(stats['total_return'] * 100, 2)}%, "
+            f"max drawdown = {round(stats['max_drawdown'] * 100, 2)}%, "
+            f"Sharpe = {round(stats['sharpe'], 2)}, trades = {int(stats['trades'])}"
+        )
@@ -11,4 +11,8 @@ class StrategyFactory:
             return SMAStrategy()
         if strategy_type == "MACD":
             return MACDStrategy()
+        if strategy_type == "BACKTEST":
+            # lazen import: backtest go vlece celiot technical stek (pandas, ta, yfinance)
+            from domashna4.strategy_pattern.backtest_strategy import BacktestStrategy
+            return BacktestStrategy()
         raise ValueError("Unknown strategy type")
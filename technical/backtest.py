@@ -0,0 +1,122 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataclasses import dataclass
+from typing import Dict, Union
+
+import numpy as np
+import pandas as pd
+
+from technical.tech_analiza import numeric_column
+
+
+@dataclass
+class BacktestResult:
+    positions: pd.DataFrame
+    returns: pd.DataFrame
+    equity: pd.DataFrame
+    drawdown: pd.DataFrame
+    stats: pd.DataFrame
+
+
+def _ffill(x: np.ndarray) -> np.ndarray:
+    rows = np.arange(x.shape[0]).reshape((-1,) + (1,) * (x.ndim - 1))
+    idx = np.maximum.accumulate(np.where(np.isnan(x), 0, rows), axis=0)
+    return np.take_along_axis(x, idx, axis=0)
+
+
+def target_positions(signal: np.ndarray, allow_short: bool = False) -> np.ndarray:
+    # BUY -> long, SELL -> izlez (ili short), HOLD ja zadrzuva prethodnata pozicija
+    signal = np.asarray(signal)
+    if signal.dtype.kind in "US" or signal.dtype == object:
+        buy = signal == "BUY"
+        sell = signal == "SELL"
+    else:
+        buy = signal > 0
+        sell = signal < 0
+
+    raw = np.where(buy, 1.0, np.where(sell, -1.0 if allow_short else 0.0, np.nan))
+    if raw.shape[0]:
+        raw[0] = np.where(np.isnan(raw[0]), 0.0, raw[0])
+    return _ffill(raw)
+
+
+def run_backtest(
+    close: np.ndarray,
+    signal: np.ndarray,
+    fee: float = 0.001,
+    slippage: float = 0.0005,
+    allow_short: bool = False,
+    periods_per_year: int = 365
+) -> Dict[str, np.ndarray]:
+    # nizi (dates,) ili (dates x symbols); signalot od bar t se izvrsuva na close od bar t+1
+    close = np.asarray(close, dtype=np.float64)
+    target = target_positions(signal, allow_short)
+
+    position = np.zeros_like(target)
+    position[1:] = target[:-1]
+    position = np.where(np.isnan(close), 0.0, position)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bar_ret = np.zeros_like(close)
+        bar_ret[1:] = close[1:] / close[:-1] - 1
+    bar_ret = np.nan_to_num(bar_ret, nan=0.0, posinf=0.0, neginf=0.0)
+
+    held = np.zeros_like(position)
+    held[1:] = position[:-1]
+    turnover = np.abs(position - held)
+
+    strat_ret = held * bar_ret - turnover * (fee + slippage)
+    equity = np.cumprod(1 + strat_ret, axis=0)
+    drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1 if len(equity) else equity
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        std = strat_ret.std(axis=0, ddof=1) if len(strat_ret) > 1 else np.full(strat_ret.shape[1:], np.nan)
+        sharpe = np.where(std > 0, strat_ret.mean(axis=0) / std * np.sqrt(periods_per_year), np.nan)
+
+    return {
+        "position": position,
+        "returns": strat_ret,
+        "equity": equity,
+        "drawdown": drawdown,
+        "total_return": equity[-1] - 1 if len(equity) else np.zeros(close.shape[1:]),
+        "max_drawdown": drawdown.min(axis=0) if len(drawdown) else np.zeros(close.shape[1:]),
+        "sharpe": sharpe,
+        "trades": (turnover > 0).sum(axis=0),
+        "exposure": (position != 0).mean(axis=0) if len(position) else np.zeros(close.shape[1:]),
+    }
+
+
+STAT_FIELDS = ["total_return", "max_drawdown", "sharpe", "trades", "exposure"]
+
+
+def backtest(
+    data: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+    fee: float = 0.001,
+    slippage: float = 0.0005,
+    allow_short: bool = False,
+    periods_per_year: int = 365
+) -> BacktestResult:
+    # data e izlez od generate_signals (eden simbol) ili od analyze_panel (Close/SIGNAL se datumi x simboli)
+    if isinstance(data, pd.DataFrame):
+        index, columns = data.index, ["strategy"]
+        close = numeric_column(data, "Close")[:, None]
+        signal = np.asarray(data["SIGNAL"]).reshape(-1, 1)
+    else:
+        index, columns = data["Close"].index, data["Close"].columns
+        close = data["Close"].to_numpy(dtype=np.float64)
+        signal = data["SIGNAL"].to_numpy()
+
+    out = run_backtest(close, signal, fee, slippage, allow_short, periods_per_year)
+
+    def frame(name):
+        return pd.DataFrame(out[name], index=index, columns=columns)
+
+    stats = pd.DataFrame({name: out[name] for name in STAT_FIELDS}, index=pd.Index(columns, name="symbol"))
+    return BacktestResult(
+        positions=frame("position"),
+        returns=frame("returns"),
+        equity=frame("equity"),
+        drawdown=frame("drawdown"),
+        stats=stats
+    )
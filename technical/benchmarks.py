@@ -0,0 +1,243 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import resource
+import subprocess
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from technical.indicators import indicator_panel, wma
+from technical.backtest import run_backtest
+from technical.sweep import config_grid, sweep
+from technical.streaming import COLUMNS, StreamingEngine, StreamingIndicators
+from technical.tech_analiza import (
+    SignalConfig, add_indicators, add_indicators_ta, generate_signals, resample_ohlcv, rule_score_row,
+    score_breakdown
+)
+
+
+def synthetic_ohlcv(n: int, seed: int = 0, freq: str = "D") -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.01, n))
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) * (1 + spread),
+        "Low": np.minimum(open_, close) * (1 - spread),
+        "Close": close,
+        "Volume": rng.uniform(1e3, 1e4, n),
+    }, index=pd.date_range("2015-01-01", periods=n, freq=freq, name="Date"))
+
+
+def reference_signals(df: pd.DataFrame, cfg: SignalConfig = SignalConfig()) -> pd.DataFrame:
+    # stariot pat so iterrows, se cuva za sporedba
+    d = df.copy()
+    scores = []
+    details = []
+
+    for _, row in d.iterrows():
+        s, br = rule_score_row(row, cfg)
+        scores.append(s)
+        details.append(br)
+
+    d["TA_SCORE"] = scores
+    d["SIGNAL"] = np.where(
+        d["TA_SCORE"] >= 2, "BUY", np.where(d["TA_SCORE"] <= -2, "SELL", "HOLD")
+    )
+    d["SCORE_BREAKDOWN"] = details
+    return d
+
+
+def timed(fn: Callable, *args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def bench_signals(n: int = 3650) -> None:
+    data = add_indicators(synthetic_ohlcv(n))
+
+    ref = reference_signals(data)
+    new = generate_signals(data)
+    assert (ref["TA_SCORE"].to_numpy() == new["TA_SCORE"].to_numpy()).all()
+    assert (ref["SIGNAL"].to_numpy() == new["SIGNAL"].to_numpy()).all()
+    assert list(ref["SCORE_BREAKDOWN"]) == score_breakdown(new)
+
+    t_ref = timed(reference_signals, data, repeat=1)
+    t_new = timed(generate_signals, data)
+    print(f"generate_signals n={n}: iterrows {t_ref:.3f}s, vectorized {t_new:.4f}s ({t_ref / t_new:.0f}x)")
+
+
+def rolling_apply_wma(close: pd.Series, window: int = 20) -> pd.Series:
+    weights = np.arange(1, window + 1)
+    return close.rolling(window=window).apply(lambda x: (x * weights).sum() / weights.sum())
+
+
+def bench_wma(n: int = 3650, window: int = 20) -> None:
+    close = synthetic_ohlcv(n)["Close"]
+
+    ref = rolling_apply_wma(close, window).to_numpy()
+    assert np.allclose(ref, wma(close, window), rtol=1e-12, equal_nan=True)
+
+    t_ref = timed(rolling_apply_wma, close, window, repeat=1)
+    t_new = timed(wma, close, window)
+    print(f"WMA_{window} n={n}: rolling.apply {t_ref:.3f}s, kernel {t_new:.5f}s ({t_ref / t_new:.0f}x)")
+
+
+def bench_streaming(n: int = 3650, symbols: int = 1000) -> None:
+    data = synthetic_ohlcv(n)
+    ref = add_indicators_ta(data)
+
+    engine = StreamingEngine()
+    out = engine.warm_up("REF", data)
+    assert np.allclose(out.to_numpy(), ref[COLUMNS].to_numpy(), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+    state = engine.states["REF"].to_state()
+    for i in range(symbols):
+        engine.states[f"S{i}"] = StreamingIndicators.from_state(state)
+    bar = data.iloc[-1]
+
+    def tick():
+        for i in range(symbols):
+            engine.update(f"S{i}", bar["High"], bar["Low"], bar["Close"], bar["Volume"])
+
+    t_batch = timed(add_indicators, data, repeat=1)
+    t_tick = timed(tick, repeat=1)
+    print(f"indicators: add_indicators n={n} {t_batch:.3f}s per symbol, "
+          f"streaming update {symbols} symbols {t_tick:.3f}s ({t_tick / symbols * 1e6:.0f}us per symbol)")
+
+
+def bench_indicators(n: int = 3650) -> None:
+    for size in (10, 20, 27, 28, 40, n):
+        data = synthetic_ohlcv(size, seed=size)
+        ref = add_indicators_ta(data)
+        new = add_indicators(data)
+        for column in ref.columns:
+            assert np.allclose(ref[column], new[column], rtol=1e-8, atol=1e-8, equal_nan=True), (size, column)
+
+    t_ref = timed(add_indicators_ta, data)
+    t_new = timed(add_indicators, data)
+    print(f"add_indicators n={n}: ta {t_ref:.3f}s, numpy kernels {t_new:.4f}s ({t_ref / t_new:.0f}x)")
+
+
+def bench_panel(n: int = 3650, symbols: int = 1000) -> None:
+    frames = [synthetic_ohlcv(n, seed=i) for i in range(symbols)]
+    fields = {f: np.column_stack([df[f].to_numpy() for df in frames]) for f in ("High", "Low", "Close", "Volume")}
+
+    panel = indicator_panel(fields["High"], fields["Low"], fields["Close"], fields["Volume"])
+    ref = add_indicators_ta(frames[-1])
+    for column, values in panel.items():
+        assert np.allclose(ref[column], values[:, -1], rtol=1e-8, atol=1e-8, equal_nan=True), column
+
+    t_one = timed(add_indicators, frames[0], repeat=1)
+    t_panel = timed(indicator_panel, fields["High"], fields["Low"], fields["Close"], fields["Volume"], repeat=1)
+    print(f"panel n={n} x {symbols}: add_indicators ~{t_one * symbols:.1f}s (loop estimate), "
+          f"indicator_panel {t_panel:.2f}s")
+
+
+def bench_sweep(n: int = 3650, symbols: int = 200) -> None:
+    grid = config_grid(rsi_buy=[25, 30, 35], rsi_sell=[65, 70, 75], stoch_buy=[15, 20], adx_trend=[15, 20, 25])
+
+    data = add_indicators(synthetic_ohlcv(n))
+    result = sweep(data, grid, keep_signals=True)
+    for i, cfg in enumerate(grid[:5]):
+        labels = generate_signals(data, cfg)["SIGNAL"].to_numpy()
+        assert (np.where(labels == "BUY", 1, np.where(labels == "SELL", -1, 0)) == result.signals[i]).all()
+
+    frames = [synthetic_ohlcv(n, seed=i) for i in range(symbols)]
+    fields = {f: np.column_stack([df[f].to_numpy() for df in frames]) for f in ("High", "Low", "Close", "Volume")}
+    panel = indicator_panel(fields["High"], fields["Low"], fields["Close"], fields["Volume"])
+    panel["Close"] = fields["Close"]
+    panel["Volume"] = fields["Volume"]
+
+    t_one = timed(generate_signals, data, grid[0])
+    t_sweep = timed(sweep, panel, grid, repeat=1)
+    print(f"sweep {len(grid)} configs x {symbols} symbols: generate_signals loop ~{t_one * len(grid) * symbols:.1f}s, "
+          f"sweep {t_sweep:.2f}s")
+
+
+def bench_backtest(n: int = 3650, symbols: int = 1000) -> None:
+    close = np.column_stack([synthetic_ohlcv(n, seed=i)["Close"].to_numpy() for i in range(symbols)])
+    signal = np.random.default_rng(0).choice(np.array(["BUY", "SELL", "HOLD"]), size=close.shape, p=[0.1, 0.1, 0.8])
+
+    t = timed(run_backtest, close, signal, repeat=1)
+    print(f"backtest {symbols} symbols x {n} bars: {t:.2f}s")
+
+
+def _reset_peak_rss() -> bool:
+    # "5" vo clear_refs go resetira VmHWM; inaku decata go nasleduva vrvot od roditelot
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss e vo KB na Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return _peak_rss_mb()
+
+
+def memory_child(copy: bool, years: int = 10) -> None:
+    # resample -> indikatori -> signali kako vo analyze(), na hourly serija; se meri vrvot na RSS
+    hourly = synthetic_ohlcv(years * 365 * 24, freq="h")
+    base = _rss_mb() if _reset_peak_rss() else _peak_rss_mb()
+
+    data = resample_ohlcv(hourly, "h", copy=copy)
+    data = add_indicators(data, inplace=not copy)
+    data = generate_signals(data, inplace=not copy)
+
+    print(f"{_peak_rss_mb() - base:.1f}")
+
+
+def bench_memory(years: int = 10) -> None:
+    # sekoj rezim vo poseben proces, za vrvot na RSS da ne se mesa
+    peaks = {}
+    for mode in ("copy", "inplace"):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--memory-child", mode, str(years)],
+            capture_output=True, text=True, check=True
+        )
+        peaks[mode] = float(out.stdout.strip().splitlines()[-1])
+
+    print(f"peak RSS over input, {years}y hourly: copy {peaks['copy']:.1f} MB, inplace {peaks['inplace']:.1f} MB")
+
+
+if __name__ == "__main__" and sys.argv[1:2] == ["--memory-child"]:
+    memory_child(sys.argv[2] == "copy", int(sys.argv[3]))
+elif __name__ == "__main__":
+    # prvo, dodeka roditelot e mal: bez /proc/self/clear_refs decata go nasleduva negoviot ru_maxrss
+    bench_memory()
+    bench_signals()
+    bench_wma()
+    bench_indicators()
+    bench_streaming()
+    bench_panel()
+    bench_sweep()
+    bench_backtest()
@@ -0,0 +1,189 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from domashna1.data.db import HISTORY_VERSION_KEY, date_to_day
+from domashna1.model.interval import history_table, interval_ms
+
+DB_PATH = "crypto.db"
+CACHE_SIZE = 256
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+_cache: "OrderedDict[Tuple, pd.DataFrame]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def db_symbol(symbol: str) -> str:
+    # "BTC-USD" (yfinance) i "BTCUSDT" (Binance) se cuvaat kako "BTC" vo history
+    s = symbol.upper()
+    for suffix in ("-USD", "USDT"):
+        if s.endswith(suffix) and len(s) > len(suffix):
+            return s[:-len(suffix)]
+    return s
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+
+def _data_version(conn: sqlite3.Connection) -> int:
+    # pipeline-ot ja zgolemuva verzijata pri sekoe zapisuvanje, pa kesot ne vrakja stari svecki
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (HISTORY_VERSION_KEY,)).fetchone()
+    except sqlite3.OperationalError:
+        # baza bez meta tabela
+        return 0
+    return row[0] if row else 0
+
+
+def _index(slots: np.ndarray, interval: str) -> pd.DatetimeIndex:
+    # etiketite se isti kako kaj resample_ohlcv ("W" -> nedela, "M" -> kraj na mesec)
+    if interval == "1w":
+        index = pd.to_datetime(slots + 6, unit="D")
+    elif interval == "1M":
+        index = pd.to_datetime(slots, unit="D") + pd.offsets.MonthEnd(0)
+    elif interval == "1d":
+        index = pd.to_datetime(slots, unit="D")
+    else:
+        index = pd.to_datetime(slots * interval_ms(interval), unit="ms")
+    return pd.DatetimeIndex(index, name="Date")
+
+
+def _frame(rows: List[tuple], interval: str) -> pd.DataFrame:
+    data = np.array(rows, dtype=np.float64).reshape(-1, 6)
+    return pd.DataFrame(
+        data[:, 1:],
+        index=_index(data[:, 0].astype(np.int64), interval),
+        columns=OHLCV_COLUMNS
+    )
+
+
+def _slot_range(start: str, end: Optional[str], interval: str) -> Tuple[int, Optional[int]]:
+    # start/end se datumi (end ne e vklucen, kako kaj yf.download)
+    start_day = date_to_day(start)
+    end_day = date_to_day(end) if end else None
+
+    _, column = history_table(interval)
+    if column == "day":
+        return start_day, end_day
+
+    per_day = 86_400_000 // interval_ms(interval)
+    return start_day * per_day, end_day * per_day if end_day is not None else None
+
+
+def _cache_get(key: Tuple) -> Optional[pd.DataFrame]:
+    with _cache_lock:
+        frame = _cache.get(key)
+        if frame is not None:
+            _cache.move_to_end(key)
+        return frame
+
+
+def _cache_put(key: Tuple, frame: pd.DataFrame) -> None:
+    with _cache_lock:
+        _cache[key] = frame
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def list_symbols(db_path: str = DB_PATH) -> List[str]:
+    # redosled po market cap, samo simboli sto imaat history
+    conn = _connect(db_path)
+    try:
+        rows = conn.execute("""
+            SELECT UPPER(c.symbol)
+            FROM coins c
+            WHERE EXISTS (SELECT 1 FROM history h WHERE h.symbol = UPPER(c.symbol))
+            GROUP BY UPPER(c.symbol)
+            ORDER BY MIN(COALESCE(c.market_cap_rank, 1e9))
+        """).fetchall()
+    finally:
+        conn.close()
+    return [r[0] for r in rows]
+
+
+def load_many(
+    symbols: Iterable[str],
+    start: str = "2024-01-01",
+    end: Optional[str] = None,
+    interval: str = "1d",
+    db_path: str = DB_PATH
+) -> Dict[str, pd.DataFrame]:
+    table, column = history_table(interval)
+    lo, hi = _slot_range(start, end, interval)
+
+    wanted = {s: db_symbol(s) for s in symbols}
+    frames: Dict[str, pd.DataFrame] = {}
+    missing = []
+
+    conn = _connect(db_path)
+    try:
+        version = _data_version(conn)
+
+        for symbol in set(wanted.values()):
+            frame = _cache_get((db_path, version, symbol, interval, lo, hi))
+            if frame is None:
+                missing.append(symbol)
+            else:
+                frames[symbol] = frame
+
+        rows_by_symbol: Dict[str, List[tuple]] = {s: [] for s in missing}
+        upper = "" if hi is None else f"AND {column} < {int(hi)}"
+
+        # edno baranje za site simboli sto gi nema vo kesot
+        for i in range(0, len(missing), 500):
+            chunk = missing[i:i + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            cursor = conn.execute(f"""
+                SELECT symbol, {column}, open, high, low, close, volume
+                FROM {table}
+                WHERE symbol IN ({placeholders}) AND {column} >= ? {upper}
+                ORDER BY symbol, {column}
+            """, (*chunk, lo))
+
+            for row in cursor:
+                rows_by_symbol[row[0]].append(row[1:])
+    finally:
+        conn.close()
+
+    for symbol, rows in rows_by_symbol.items():
+        frame = _frame(rows, interval)
+        _cache_put((db_path, version, symbol, interval, lo, hi), frame)
+        frames[symbol] = frame
+
+    # plitka kopija: povikuvacot moze da dodava koloni bez da go menuva kesot
+    return {s: frames[db_s].copy(deep=False) for s, db_s in wanted.items()}
+
+
+def load_history(
+    symbol: str,
+    start: str = "2024-01-01",
+    end: Optional[str] = None,
+    interval: str = "1d",
+    db_path: str = DB_PATH
+) -> pd.DataFrame:
+    return load_many([symbol], start, end, interval, db_path)[symbol]
+
+
+def load_panel(
+    symbols: Iterable[str],
+    start: str = "2024-01-01",
+    end: Optional[str] = None,
+    interval: str = "1d",
+    db_path: str = DB_PATH
+) -> Dict[str, pd.DataFrame]:
+    # edna tabela (datumi x simboli) po OHLCV pole; simbolite listirani podocna imaat NaN na pocetok
+    frames = load_many(symbols, start, end, interval, db_path)
+    wide = pd.concat(frames, axis=1, names=["symbol", "field"]).sort_index()
+    return {field: wide.xs(field, axis=1, level="field") for field in OHLCV_COLUMNS}
@@ -0,0 +1,268 @@
+from typing import Dict, Tuple
+
+import numpy as np
+
+BLOCK = 64
+
+
+def _as_float(values) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _first_valid(*arrays: np.ndarray) -> np.ndarray:
+    # prv red kade site vlezovi se validni, po kolona (panel: razlicni datumi na listiranje)
+    valid = np.ones(arrays[0].shape, dtype=bool)
+    for a in arrays:
+        valid &= ~np.isnan(a)
+    first = np.argmax(valid, axis=0)
+    return np.where(valid.any(axis=0), first, valid.shape[0])
+
+
+def _shift_rows(x: np.ndarray, offsets: np.ndarray, sign: int) -> np.ndarray:
+    n = x.shape[0]
+    rows = np.arange(n).reshape((n,) + (1,) * (x.ndim - 1))
+    src = rows + sign * offsets
+    inside = (src >= 0) & (src < n)
+    cols = np.indices(x.shape)[1:] if x.ndim > 1 else ()
+    out = x[(np.clip(src, 0, n - 1),) + tuple(cols)]
+    return np.where(inside, out, np.nan)
+
+
+def _align_left(*arrays: np.ndarray) -> Tuple[Tuple[np.ndarray, ...], np.ndarray]:
+    # sekoja kolona se pomestuva da pocnuva od red 0, pa kernelite ne gledaat pocetni NaN
+    offsets = _first_valid(*arrays)
+    if not offsets.any():
+        return arrays, offsets
+    return tuple(_shift_rows(a, offsets, +1) for a in arrays), offsets
+
+
+def _align_back(x: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    if not offsets.any():
+        return x
+    return _shift_rows(x, offsets, -1)
+
+
+def _ffill(x: np.ndarray) -> np.ndarray:
+    mask = np.isnan(x)
+    if not mask.any():
+        return x
+    idx = np.where(mask, 0, np.arange(x.shape[0]).reshape((-1,) + (1,) * (x.ndim - 1)))
+    idx = np.maximum.accumulate(idx, axis=0)
+    return np.take_along_axis(x, idx, axis=0)
+
+
+def _recurrence(x: np.ndarray, decay: float, gain: float, y0) -> np.ndarray:
+    # y[t] = decay * y[t-1] + gain * x[t], blok po blok so dolno-triagolna matrica
+    n = x.shape[0]
+    flat = x.reshape(n, -1)
+    out = np.empty_like(flat)
+
+    k = np.arange(BLOCK)
+    lower = np.tril(gain * decay ** np.maximum(k[:, None] - k[None, :], 0).astype(np.float64))
+    carry_w = decay ** (k + 1.0)
+
+    prev = np.broadcast_to(np.asarray(y0, dtype=np.float64), flat.shape[1:]).copy()
+    for start in range(0, n, BLOCK):
+        b = min(BLOCK, n - start)
+        out[start:start + b] = lower[:b, :b] @ flat[start:start + b] + carry_w[:b, None] * prev
+        prev = out[start + b - 1]
+    return out.reshape(x.shape)
+
+
+def _window_slices(x: np.ndarray, window: int):
+    n = x.shape[0]
+    return [x[k:n - window + 1 + k] for k in range(window)]
+
+
+def _rolling(x: np.ndarray, window: int, reduce) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if window < 1 or x.shape[0] < window:
+        return out
+    out[window - 1:] = reduce(_window_slices(x, window))
+    return out
+
+
+def _valid_from(x: np.ndarray, start) -> np.ndarray:
+    rows = np.arange(x.shape[0]).reshape((-1,) + (1,) * (x.ndim - 1))
+    return np.where(rows >= start, x, np.nan)
+
+
+def ewm(values, alpha: float, min_periods: int = 0) -> np.ndarray:
+    # pandas ewm(alpha, adjust=False); prazninite vo sredina se popolnuvaat so prethodnata vrednost
+    (x,), offsets = _align_left(_as_float(values))
+    x = _ffill(x)
+    out = np.full(x.shape, np.nan)
+    if x.shape[0]:
+        out = _recurrence(x, 1.0 - alpha, alpha, x[0])
+    out = _valid_from(out, max(min_periods, 1) - 1)
+    return _align_back(out, offsets)
+
+
+def ema(values, window: int) -> np.ndarray:
+    return ewm(values, 2.0 / (window + 1), window)
+
+
+def sma(values, window: int) -> np.ndarray:
+    return _rolling(_as_float(values), window, lambda s: sum(s) / window)
+
+
+def rolling_std(values, window: int) -> np.ndarray:
+    # dva prolaza: prvo sredina, pa kvadratni otstapuvanja (ddof=0)
+    x = _as_float(values)
+    mean = sma(x, window)[window - 1:]
+    return _rolling(x, window, lambda s: np.sqrt(sum((v - mean) ** 2 for v in s) / window))
+
+
+def rolling_mad(values, window: int) -> np.ndarray:
+    x = _as_float(values)
+    mean = sma(x, window)[window - 1:]
+    return _rolling(x, window, lambda s: sum(np.abs(v - mean) for v in s) / window)
+
+
+def rolling_min(values, window: int) -> np.ndarray:
+    return _rolling(_as_float(values), window, lambda s: np.minimum.reduce(s))
+
+
+def rolling_max(values, window: int) -> np.ndarray:
+    return _rolling(_as_float(values), window, lambda s: np.maximum.reduce(s))
+
+
+def wma(values, window: int = 20) -> np.ndarray:
+    # tezini 1..window, najnovata vrednost ima najgolema tezina
+    x = _as_float(values)
+    n = x.shape[0]
+    out = np.full(x.shape, np.nan)
+    if window < 1 or n < window:
+        return out
+
+    acc = np.zeros((n - window + 1,) + x.shape[1:])
+    for k in range(1, window + 1):
+        acc += k * x[k - 1:n - window + k]
+
+    out[window - 1:] = acc / (window * (window + 1) / 2)
+    return out
+
+
+def rsi(close, window: int = 14) -> np.ndarray:
+    (c,), offsets = _align_left(_as_float(close))
+    diff = np.diff(c, axis=0, prepend=np.nan)
+    # ta: prvata razlika e NaN i se broi kako 0
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    up = np.where(np.isnan(c), np.nan, up)
+    down = np.where(np.isnan(c), np.nan, down)
+
+    avg_up = ewm(up, 1.0 / window, window)
+    avg_down = ewm(down, 1.0 / window, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(avg_down == 0, 100.0, 100 - (100 / (1 + avg_up / avg_down)))
+    return _align_back(out, offsets)
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    line = ema(close, fast) - ema(close, slow)
+    sig = ema(line, signal)
+    return line, sig, line - sig
+
+
+def stoch(high, low, close, window: int = 14) -> np.ndarray:
+    low_min = rolling_min(low, window)
+    high_max = rolling_max(high, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 * (_as_float(close) - low_min) / (high_max - low_min)
+
+
+def adx(high, low, close, window: int = 14) -> np.ndarray:
+    (h, l, c), offsets = _align_left(_as_float(high), _as_float(low), _as_float(close))
+    n = h.shape[0]
+    w = window
+    out = np.zeros(h.shape)
+
+    if n >= 2 * w:
+        prev_c = np.roll(c, 1, axis=0)
+        tr = np.maximum(h, prev_c) - np.minimum(l, prev_c)
+        up = h - np.roll(h, 1, axis=0)
+        down = np.roll(l, 1, axis=0) - l
+        pos = np.where((up > down) & (up > 0), up, 0.0)
+        neg = np.where((down > up) & (down > 0), down, 0.0)
+
+        # ta.trend.ADXIndicator: Wilder sumi od vtorata sveka, pocnuvaat so sumata na 1..w
+        def wilder(x):
+            first = x[1:w + 1].sum(axis=0)
+            rest = _recurrence(_ffill(x[w + 1:]), 1.0 - 1.0 / w, 1.0, first)
+            return np.concatenate([np.expand_dims(first, 0), rest])
+
+        trs = wilder(tr)
+        dip = wilder(pos)
+        din = wilder(neg)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            di_pos = np.where(trs != 0, 100 * dip / trs, 0.0)
+            di_neg = np.where(trs != 0, 100 * din / trs, 0.0)
+            total = di_pos + di_neg
+            dx = np.where(total != 0, 100 * np.abs((di_pos - di_neg) / total), 0.0)
+
+        first = dx[:w].mean(axis=0)
+        out[2 * w - 1] = first
+        if n > 2 * w:
+            out[2 * w:] = _recurrence(dx[w:], (w - 1) / w, 1.0 / w, first)
+
+    # ta frla greska za pokratki serii, add_indicators togas stava NaN
+    valid_len = np.sum(~np.isnan(c), axis=0)
+    out = np.where(valid_len >= 2 * w, out, np.nan)
+    out = np.where(np.isnan(c), np.nan, out)
+    return _align_back(out, offsets)
+
+
+def cci(high, low, close, window: int = 20, constant: float = 0.015) -> np.ndarray:
+    typical = (_as_float(high) + _as_float(low) + _as_float(close)) / 3.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (typical - sma(typical, window)) / (constant * rolling_mad(typical, window))
+
+
+def bollinger(close, window: int = 20, window_dev: float = 2.0) -> Tuple[np.ndarray, np.ndarray]:
+    mid = sma(close, window)
+    std = rolling_std(close, window)
+    return mid + window_dev * std, mid - window_dev * std
+
+
+def adaptive_adx(high, low, close, window: int = 14) -> np.ndarray:
+    # add_indicators za frame pokratok od window koristi max(3, len // 2);
+    # vo panel istoto pravilo vazi po kolona, od prviot validen red (listiranjeto) do kraj
+    high, low, close = (_as_float(a) for a in (high, low, close))
+    if close.ndim == 1:
+        return adaptive_adx(high[:, None], low[:, None], close[:, None], window)[:, 0]
+
+    lengths = close.shape[0] - _first_valid(close)
+    windows = np.where(lengths >= window, window, np.maximum(3, lengths // 2))
+    if (windows == window).all():
+        return adx(high, low, close, window)
+
+    out = np.empty(close.shape)
+    for w in np.unique(windows):
+        cols = windows == w
+        out[:, cols] = adx(high[:, cols], low[:, cols], close[:, cols], int(w))
+    return out
+
+
+def indicator_panel(high, low, close, volume, adx_window: int = 14) -> Dict[str, np.ndarray]:
+    # istite koloni kako add_indicators; vlezovite se (datumi,) ili (datumi x simboli)
+    high, low, close, volume = (_as_float(a) for a in (high, low, close, volume))
+    macd_line, macd_signal, macd_hist = macd(close)
+    bb_upper, bb_lower = bollinger(close)
+
+    return {
+        "RSI_14": rsi(close, 14),
+        "MACD": macd_line,
+        "MACD_SIGNAL": macd_signal,
+        "MACD_HIST": macd_hist,
+        "STOCH_%K": stoch(high, low, close, 14),
+        "ADX_14": adaptive_adx(high, low, close, adx_window),
+        "CCI_20": cci(high, low, close, 20),
+        "SMA_20": sma(close, 20),
+        "EMA_20": ema(close, 20),
+        "WMA_20": wma(close, 20),
+        "BB_UPPER": bb_upper,
+        "BB_LOWER": bb_lower,
+        "VOL_MA_20": sma(volume, 20),
+    }
@@ -0,0 +1,163 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from technical.history_source import DB_PATH, OHLCV_COLUMNS, list_symbols, load_many
+from technical.tech_analiza import (
+    SignalConfig, Timeframe, ROLLUP_INTERVALS, add_indicators, generate_signals, latest_summary, resample_ohlcv
+)
+
+# podatocite za site simboli se vo dva memmap fajla, workerite gi otvoraat samo za citanje
+_values: Optional[np.memmap] = None
+_dates: Optional[np.memmap] = None
+
+
+def _write_memmap(frames: Dict[str, pd.DataFrame], folder: str) -> Tuple[Dict[str, Tuple[int, int]], int]:
+    total = sum(len(df) for df in frames.values())
+    spans: Dict[str, Tuple[int, int]] = {}
+    if total == 0:
+        return spans, 0
+
+    values = np.memmap(os.path.join(folder, "ohlcv.f64"), dtype=np.float64, mode="w+", shape=(total, len(OHLCV_COLUMNS)))
+    dates = np.memmap(os.path.join(folder, "dates.i64"), dtype=np.int64, mode="w+", shape=(total,))
+
+    pos = 0
+    for symbol, df in frames.items():
+        n = len(df)
+        values[pos:pos + n] = df[OHLCV_COLUMNS].to_numpy()
+        dates[pos:pos + n] = df.index.asi8
+        spans[symbol] = (pos, pos + n)
+        pos += n
+
+    values.flush()
+    dates.flush()
+    del values, dates
+    return spans, total
+
+
+def _init_worker(folder: str, total: int) -> None:
+    global _values, _dates
+    if total:
+        _values = np.memmap(os.path.join(folder, "ohlcv.f64"), dtype=np.float64, mode="r", shape=(total, len(OHLCV_COLUMNS)))
+        _dates = np.memmap(os.path.join(folder, "dates.i64"), dtype=np.int64, mode="r", shape=(total,))
+
+
+def _scan_symbol(symbol: str, span: Tuple[int, int], rule: Optional[str], cfg: SignalConfig) -> Dict[str, object]:
+    t = time.perf_counter()
+    row: Dict[str, object] = {"symbol": symbol, "rows": span[1] - span[0]}
+    try:
+        if span[1] == span[0]:
+            raise ValueError("nema history za simbolot")
+
+        data = pd.DataFrame(
+            _values[span[0]:span[1]],
+            index=pd.DatetimeIndex(_dates[span[0]:span[1]].astype("datetime64[ns]"), name="Date"),
+            columns=OHLCV_COLUMNS
+        )
+        if rule is not None:
+            data = resample_ohlcv(data, rule)
+
+        summary = latest_summary(generate_signals(add_indicators(data), cfg))
+        row.update(summary)
+        row["status"] = "ok"
+    except Exception as e:
+        row["status"] = f"error: {e}"
+
+    row["seconds"] = time.perf_counter() - t
+    return row
+
+
+def _run_pool(
+    symbols: List[str],
+    spans: Dict[str, Tuple[int, int]],
+    rules: Dict[str, Optional[str]],
+    cfg: SignalConfig,
+    folder: str,
+    total: int,
+    workers: Optional[int],
+    rows: List[Dict[str, object]]
+) -> List[str]:
+    # gi vrakja simbolite sto ne zavrsile bidejki nekoj worker proces padnal
+    broken: List[str] = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(folder, total)) as pool:
+        futures = {
+            symbol: pool.submit(_scan_symbol, symbol, spans.get(symbol, (0, 0)), rules.get(symbol), cfg)
+            for symbol in symbols
+        }
+        for symbol, future in futures.items():
+            try:
+                rows.append(future.result())
+            except BrokenProcessPool:
+                broken.append(symbol)
+            except Exception as e:
+                rows.append({"symbol": symbol, "status": f"error: {e}", "seconds": np.nan})
+    return broken
+
+
+def scan(
+    symbols: Optional[Iterable[str]] = None,
+    timeframe: Timeframe = "1D",
+    start: str = "2024-01-01",
+    end: Optional[str] = None,
+    cfg: SignalConfig = SignalConfig(),
+    workers: Optional[int] = None,
+    db_path: str = DB_PATH
+) -> pd.DataFrame:
+    if timeframe != "1D" and timeframe not in ROLLUP_INTERVALS:
+        raise ValueError("timeframe must be one of: '1D','1W','1M'")
+
+    symbols = list_symbols(db_path) if symbols is None else list(symbols)
+
+    # 1W/1M se citaat od rollup tabelite (Filter4Rollup), kako load_timeframe(source="db");
+    # dnevnite svecki se resample-iraat vo workerot samo za simboli bez rollup
+    rules: Dict[str, Optional[str]] = {}
+    if timeframe == "1D":
+        frames = load_many(symbols, start, end, db_path=db_path)
+    else:
+        interval, rule = ROLLUP_INTERVALS[timeframe]
+        frames = load_many(symbols, start, end, interval=interval, db_path=db_path)
+        missing = [symbol for symbol, df in frames.items() if df.empty]
+        if missing:
+            frames.update(load_many(missing, start, end, db_path=db_path))
+            rules = {symbol: rule for symbol in missing}
+
+    rows: List[Dict[str, object]] = []
+    with tempfile.TemporaryDirectory(prefix="scan_") as folder:
+        spans, total = _write_memmap(frames, folder)
+
+        args = (spans, rules, cfg, folder, total)
+        pending = _run_pool(symbols, *args, workers, rows)
+
+        # po pad na worker celiot pool e neupotrebliv: ostanatite simboli odat vo nov pool,
+        # vo grupi od po eden simbol na worker; grupa sto povtorno padne se vrti simbol po simbol
+        size = workers or os.cpu_count() or 1
+        for i in range(0, len(pending), size):
+            for symbol in _run_pool(pending[i:i + size], *args, workers, rows):
+                if _run_pool([symbol], *args, 1, rows):
+                    rows.append({"symbol": symbol, "status": "error: worker procesot padna", "seconds": np.nan})
+
+    result = pd.DataFrame(rows)
+    if "ta_score" not in result.columns:
+        result["ta_score"] = None
+
+    result["ta_score"] = pd.to_numeric(result["ta_score"], errors="coerce")
+    result["ok"] = result["status"] == "ok"
+    result = result.sort_values(["ok", "ta_score", "symbol"], ascending=[False, False, True])
+    return result.drop(columns="ok").reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    tf = sys.argv[1] if len(sys.argv) > 1 else "1D"
+    t0 = time.perf_counter()
+    table = scan(timeframe=tf)
+    print(table.to_string(max_rows=50))
+    failed = (table["status"] != "ok").sum()
+    print(f"Skenirani {len(table)} simboli ({failed} so greska) za {time.perf_counter() - t0:.2f}s")
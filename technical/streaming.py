@@ -0,0 +1,358 @@
+import math
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+NAN = float("nan")
+
+COLUMNS = [
+    "RSI_14", "MACD", "MACD_SIGNAL", "MACD_HIST", "STOCH_%K", "ADX_14", "CCI_20",
+    "SMA_20", "EMA_20", "WMA_20", "BB_UPPER", "BB_LOWER", "VOL_MA_20",
+]
+
+
+def _div(num: float, den: float) -> float:
+    # isto kako pandas: x/0 -> +-inf, 0/0 -> NaN
+    if den != 0:
+        return num / den
+    if num == 0 or math.isnan(num):
+        return NAN
+    return math.copysign(math.inf, num)
+
+
+class Ewm:
+    # ewm(alpha, adjust=False, min_periods) od pandas, vrednost po vrednost
+    def __init__(self, alpha: float, min_periods: int):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.nobs = 0
+
+    def update(self, x: float) -> float:
+        if self.nobs == 0:
+            self.value = x
+        else:
+            old = 1.0 - self.alpha
+            self.value = (old * self.value + self.alpha * x) / (old + self.alpha)
+        self.nobs += 1
+        return self.value if self.nobs >= self.min_periods else NAN
+
+    def to_state(self) -> dict:
+        return {"value": self.value, "nobs": self.nobs}
+
+    def load_state(self, state: dict) -> None:
+        self.value = state["value"]
+        self.nobs = state["nobs"]
+
+
+class RollingWindow:
+    # ring buffer so tekovna suma, tezinska suma (za WMA) i Welford varijansa
+    def __init__(self, size: int):
+        self.size = size
+        self.buf = [0.0] * size
+        self.pos = 0
+        self.count = 0
+        self.total = 0.0
+        self.weighted = 0.0
+        self.mean_ = 0.0
+        self.ssqdm = 0.0
+
+    def push(self, x: float) -> None:
+        full = self.count == self.size
+        dropped = self.buf[self.pos] if full else 0.0
+        prev_total = self.total
+
+        self.buf[self.pos] = x
+        self.pos = (self.pos + 1) % self.size
+
+        if full:
+            self.weighted += self.size * x - prev_total
+            self.total += x - dropped
+            self._remove(dropped)
+        else:
+            self.count += 1
+            self.weighted += self.count * x
+            self.total += x
+        self._add(x)
+
+        # koga bufferot ke se zavrti, sumite se presmetuvaat odnovo za da nema drift
+        if full and self.pos == 0:
+            self._resync()
+
+    def _add(self, x: float) -> None:
+        n = self.count
+        delta = x - self.mean_
+        self.mean_ += delta / n
+        self.ssqdm += (n - 1) * delta * delta / n
+
+    def _remove(self, x: float) -> None:
+        n = self.size - 1
+        delta = x - self.mean_
+        self.mean_ -= delta / n
+        self.ssqdm -= (n + 1) * delta * delta / n
+
+    def _resync(self) -> None:
+        values = self.values()
+        if not values:
+            return
+        self.total = math.fsum(values)
+        self.weighted = math.fsum((i + 1) * v for i, v in enumerate(values))
+        self.mean_ = self.total / len(values)
+        self.ssqdm = math.fsum((v - self.mean_) ** 2 for v in values)
+
+    @property
+    def ready(self) -> bool:
+        return self.count == self.size
+
+    def values(self) -> List[float]:
+        if not self.ready:
+            return self.buf[:self.count]
+        return self.buf[self.pos:] + self.buf[:self.pos]
+
+    def mean(self) -> float:
+        return self.total / self.size if self.ready else NAN
+
+    def wma(self) -> float:
+        return self.weighted / (self.size * (self.size + 1) / 2) if self.ready else NAN
+
+    def std(self) -> float:
+        return math.sqrt(max(self.ssqdm, 0.0) / self.size) if self.ready else NAN
+
+    def mad(self) -> float:
+        # sredno apsolutno otstapuvanje nema O(1) update, O(window) e za window=20
+        if not self.ready:
+            return NAN
+        values = self.values()
+        m = float(np.mean(values))
+        return float(np.mean(np.abs(np.asarray(values) - m)))
+
+    def to_state(self) -> dict:
+        return {"values": self.values()}
+
+    def load_state(self, state: dict) -> None:
+        values = [float(v) for v in state["values"]]
+        self.buf = values + [0.0] * (self.size - len(values))
+        self.count = len(values)
+        self.pos = self.count % self.size
+        self._resync()
+
+
+class RollingExtreme:
+    # monotona deque za rolling min/max, amortizirano O(1)
+    def __init__(self, size: int, is_max: bool):
+        self.size = size
+        self.is_max = is_max
+        self.items = deque()
+        self.index = 0
+
+    def push(self, x: float) -> float:
+        better = (lambda a, b: a >= b) if self.is_max else (lambda a, b: a <= b)
+        while self.items and better(x, self.items[-1][1]):
+            self.items.pop()
+        self.items.append((self.index, x))
+        if self.items[0][0] <= self.index - self.size:
+            self.items.popleft()
+        self.index += 1
+        return self.items[0][1] if self.index >= self.size else NAN
+
+    def to_state(self) -> dict:
+        return {"items": [list(item) for item in self.items], "index": self.index}
+
+    def load_state(self, state: dict) -> None:
+        self.items = deque((int(i), float(v)) for i, v in state["items"])
+        self.index = state["index"]
+
+
+class StreamingIndicators:
+    # istite koloni kako add_indicators, no se azuriraat so sekoja nova sveka
+    def __init__(self):
+        self.n = 0
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.prev_close = NAN
+
+        self.rsi_up = Ewm(1 / 14, 14)
+        self.rsi_down = Ewm(1 / 14, 14)
+
+        self.ema_fast = Ewm(2 / 13, 12)
+        self.ema_slow = Ewm(2 / 27, 26)
+        self.macd_signal = Ewm(2 / 10, 9)
+
+        self.stoch_low = RollingExtreme(14, is_max=False)
+        self.stoch_high = RollingExtreme(14, is_max=True)
+
+        self.adx_window = 14
+        self.trs = 0.0
+        self.dip = 0.0
+        self.din = 0.0
+        self.dx_initial: List[float] = []
+        self.adx = NAN
+
+        self.typical = RollingWindow(20)
+        self.closes = RollingWindow(20)
+        self.ema_20 = Ewm(2 / 21, 20)
+        self.volumes = RollingWindow(20)
+
+    def _update_adx(self, high: float, low: float, close: float) -> float:
+        w = self.adx_window
+        # ta (i add_indicators) davaat 0.0 za ADX dodeka ne se sobere 2*window-1 sveki
+        n = self.n
+        if n == 0:
+            return 0.0
+
+        # ta.trend.ADXIndicator: TR i +DM/-DM se sobiraat od vtorata sveka
+        tr = max(high, self.prev_close) - min(low, self.prev_close)
+        up = high - self.prev_high
+        down = self.prev_low - low
+        pos = up if up > down and up > 0 else 0.0
+        neg = down if down > up and down > 0 else 0.0
+
+        if n <= w:
+            self.trs += tr
+            self.dip += pos
+            self.din += neg
+            if n < w:
+                return 0.0
+        else:
+            self.trs = self.trs - self.trs / float(w) + tr
+            self.dip = self.dip - self.dip / float(w) + pos
+            self.din = self.din - self.din / float(w) + neg
+
+        di_pos = 100 * (self.dip / self.trs) if self.trs != 0 else 0
+        di_neg = 100 * (self.din / self.trs) if self.trs != 0 else 0
+        dx = 100 * abs((di_pos - di_neg) / (di_pos + di_neg)) if di_pos + di_neg != 0 else 0
+
+        if n < 2 * w - 1:
+            self.dx_initial.append(dx)
+            return 0.0
+        if n == 2 * w - 1:
+            self.dx_initial.append(dx)
+            self.adx = float(np.mean(self.dx_initial))
+            self.dx_initial = []
+        else:
+            self.adx = ((self.adx * (w - 1)) + dx) / float(w)
+        return self.adx
+
+    def update(self, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        high, low, close, volume = float(high), float(low), float(close), float(volume)
+
+        diff = close - self.prev_close if self.n else 0.0
+        avg_up = self.rsi_up.update(diff if diff > 0 else 0.0)
+        avg_down = self.rsi_down.update(-diff if diff < 0 else 0.0)
+        if math.isnan(avg_down):
+            rsi = NAN
+        else:
+            rsi = 100.0 if avg_down == 0 else 100 - (100 / (1 + _div(avg_up, avg_down)))
+
+        macd = self.ema_fast.update(close) - self.ema_slow.update(close)
+        signal = NAN if math.isnan(macd) else self.macd_signal.update(macd)
+
+        low_min = self.stoch_low.push(low)
+        high_max = self.stoch_high.push(high)
+        stoch_k = _div(100 * (close - low_min), high_max - low_min)
+
+        adx = self._update_adx(high, low, close)
+
+        self.typical.push((high + low + close) / 3.0)
+        cci = _div((high + low + close) / 3.0 - self.typical.mean(), 0.015 * self.typical.mad())
+
+        self.closes.push(close)
+        sma = self.closes.mean()
+        std = self.closes.std()
+        self.volumes.push(volume)
+
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+        self.n += 1
+
+        return {
+            "RSI_14": rsi,
+            "MACD": macd,
+            "MACD_SIGNAL": signal,
+            "MACD_HIST": macd - signal,
+            "STOCH_%K": stoch_k,
+            "ADX_14": adx,
+            "CCI_20": cci,
+            "SMA_20": sma,
+            "EMA_20": self.ema_20.update(close),
+            "WMA_20": self.closes.wma(),
+            "BB_UPPER": sma + 2.0 * std,
+            "BB_LOWER": sma - 2.0 * std,
+            "VOL_MA_20": self.volumes.mean(),
+        }
+
+    def to_state(self) -> dict:
+        return {
+            "n": self.n,
+            "prev": [self.prev_high, self.prev_low, self.prev_close],
+            "rsi_up": self.rsi_up.to_state(),
+            "rsi_down": self.rsi_down.to_state(),
+            "ema_fast": self.ema_fast.to_state(),
+            "ema_slow": self.ema_slow.to_state(),
+            "macd_signal": self.macd_signal.to_state(),
+            "stoch_low": self.stoch_low.to_state(),
+            "stoch_high": self.stoch_high.to_state(),
+            "adx": [self.trs, self.dip, self.din, self.adx, list(self.dx_initial)],
+            "typical": self.typical.to_state(),
+            "closes": self.closes.to_state(),
+            "ema_20": self.ema_20.to_state(),
+            "volumes": self.volumes.to_state(),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "StreamingIndicators":
+        s = cls()
+        s.n = state["n"]
+        s.prev_high, s.prev_low, s.prev_close = state["prev"]
+        s.trs, s.dip, s.din, s.adx, dx_initial = state["adx"]
+        s.dx_initial = list(dx_initial)
+
+        for name in ("rsi_up", "rsi_down", "ema_fast", "ema_slow", "macd_signal",
+                     "stoch_low", "stoch_high", "typical", "closes", "ema_20", "volumes"):
+            getattr(s, name).load_state(state[name])
+        return s
+
+
+class StreamingEngine:
+    # sostojba po simbol; eden update po nova sveka za sekoj simbol
+    def __init__(self):
+        self.states: Dict[str, StreamingIndicators] = {}
+        self.latest: Dict[str, Dict[str, float]] = {}
+
+    def update(self, symbol: str, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        state = self.states.get(symbol)
+        if state is None:
+            state = self.states[symbol] = StreamingIndicators()
+
+        values = state.update(high, low, close, volume)
+        self.latest[symbol] = {"Close": float(close), "Volume": float(volume), **values}
+        return values
+
+    def warm_up(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        self.states.pop(symbol, None)
+        rows = [
+            self.update(symbol, h, l, c, v)
+            for h, l, c, v in zip(df["High"], df["Low"], df["Close"], df["Volume"])
+        ]
+        return pd.DataFrame(rows, index=df.index, columns=COLUMNS)
+
+    def snapshot(self, symbols: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        # posledni vrednosti za site simboli, gotovo za generate_signals
+        symbols = list(self.latest) if symbols is None else list(symbols)
+        return pd.DataFrame([self.latest[s] for s in symbols], index=pd.Index(symbols, name="symbol"))
+
+    def to_state(self) -> dict:
+        return {
+            symbol: {"indicators": state.to_state(), "latest": self.latest.get(symbol)}
+            for symbol, state in self.states.items()
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "StreamingEngine":
+        engine = cls()
+        for symbol, item in state.items():
+            engine.states[symbol] = StreamingIndicators.from_state(item["indicators"])
+            if item.get("latest") is not None:
+                engine.latest[symbol] = item["latest"]
+        return engine
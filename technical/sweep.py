@@ -0,0 +1,138 @@
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import itertools
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from technical.tech_analiza import SCORE_INPUTS, SignalConfig, numeric_column, score_components
+
+CONFIG_FIELDS = [f.name for f in fields(SignalConfig)]
+
+# sekoja komponenta zavisi samo od svoite pragovi
+COMPONENT_FIELDS = {
+    "RSI": ("rsi_buy", "rsi_sell"),
+    "STOCH": ("stoch_buy", "stoch_sell"),
+    "CCI": ("cci_buy", "cci_sell"),
+    "MAs": ("adx_trend",),
+}
+
+
+@dataclass
+class SweepResult:
+    stats: pd.DataFrame
+    # (configs, dates[, symbols]) so 1 = BUY, -1 = SELL, 0 = HOLD; None ako keep_signals=False
+    signals: Optional[np.ndarray] = None
+
+
+def config_grid(**values) -> List[SignalConfig]:
+    # config_grid(rsi_buy=[25, 30], rsi_sell=[70, 75]) -> 4 konfiguracii, ostanatite polinja default
+    unknown = set(values) - set(CONFIG_FIELDS)
+    if unknown:
+        raise ValueError(f"Nepoznati polinja vo SignalConfig: {sorted(unknown)}")
+
+    names = list(values)
+    return [SignalConfig(**dict(zip(names, combo))) for combo in itertools.product(*values.values())]
+
+
+def _inputs(data: Union[pd.DataFrame, Dict[str, object]]) -> Dict[str, np.ndarray]:
+    if isinstance(data, pd.DataFrame):
+        return {name: numeric_column(data, name) for name in SCORE_INPUTS}
+    return {name: np.asarray(data[name], dtype=np.float64) for name in SCORE_INPUTS}
+
+
+def _stacked(configs: List[SignalConfig], ndim: int) -> SignalConfig:
+    # poleto na konfiguracijata e niza (C, 1, ...) pa se broadcast-ira so (dates[, symbols])
+    shape = (len(configs),) + (1,) * ndim
+    return SignalConfig(**{
+        name: np.array([getattr(cfg, name) for cfg in configs], dtype=np.float64).reshape(shape)
+        for name in CONFIG_FIELDS
+    })
+
+
+def _component_tables(cols: Dict[str, np.ndarray], configs: List[SignalConfig], ndim: int):
+    # komponentite se presmetuvaat samo za unikatnite pragovi vo mrezata, pa se indeksiraat po konfiguracija
+    shape = cols["Close"].shape
+    tables = {}
+    for key, names in COMPONENT_FIELDS.items():
+        keys = [tuple(getattr(cfg, name) for name in names) for cfg in configs]
+        unique = list(dict.fromkeys(keys))
+        stacked = _stacked([SignalConfig(**dict(zip(names, u))) for u in unique], ndim)
+        values = np.broadcast_to(score_components(cols, stacked)[key], (len(unique),) + shape)
+        index = np.array([unique.index(k) for k in keys])
+        tables[key] = (values.astype(np.int8), index)
+
+    macd = score_components(cols, SignalConfig())["MACD"].astype(np.int8)
+    return macd, tables
+
+
+def forward_returns(close: np.ndarray, horizon: int = 1) -> np.ndarray:
+    out = np.full(close.shape, np.nan)
+    if horizon < len(close):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[:-horizon] = close[horizon:] / close[:-horizon] - 1
+    return out
+
+
+def sweep(
+    data: Union[pd.DataFrame, Dict[str, object]],
+    configs: List[SignalConfig],
+    horizon: int = 1,
+    keep_signals: bool = False,
+    max_cells: int = 50_000_000
+) -> SweepResult:
+    cols = _inputs(data)
+    close = cols["Close"]
+
+    fwd = forward_returns(close, horizon).ravel()
+    valid = ~np.isnan(fwd)
+    up = valid & (fwd > 0)
+    down = valid & (fwd < 0)
+    fwd0 = np.where(valid, fwd, 0.0)
+
+    chunk = max(1, max_cells // max(close.size, 1))
+    signals = np.empty((len(configs),) + close.shape, dtype=np.int8) if keep_signals else None
+    counts = {key: np.zeros(len(configs)) for key in ("n_buy", "n_sell", "buy_hits", "sell_hits", "buy_ret", "sell_ret")}
+
+    macd, tables = _component_tables(cols, configs, close.ndim)
+
+    # konfiguraciite se obrabotuvaat vo delovi za (C x dates x symbols) da ne ja nadmine memorijata
+    for start in range(0, len(configs), chunk):
+        part = configs[start:start + chunk]
+        sl = slice(start, start + len(part))
+
+        score = np.broadcast_to(macd, (len(part),) + close.shape).copy()
+        for values, index in tables.values():
+            score += values[index[sl]]
+
+        buy = score >= 2
+        sell = score <= -2
+        if signals is not None:
+            signals[sl] = buy.view(np.int8) - sell.view(np.int8)
+
+        flat_buy = buy.reshape(len(part), -1)
+        flat_sell = sell.reshape(len(part), -1)
+        counts["n_buy"][sl] = np.count_nonzero(flat_buy & valid, axis=1)
+        counts["n_sell"][sl] = np.count_nonzero(flat_sell & valid, axis=1)
+        counts["buy_hits"][sl] = np.count_nonzero(flat_buy & up, axis=1)
+        counts["sell_hits"][sl] = np.count_nonzero(flat_sell & down, axis=1)
+        counts["buy_ret"][sl] = flat_buy.astype(np.float64) @ fwd0
+        counts["sell_ret"][sl] = flat_sell.astype(np.float64) @ fwd0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n_signals = counts["n_buy"] + counts["n_sell"]
+        stats = pd.DataFrame({name: [getattr(cfg, name) for cfg in configs] for name in CONFIG_FIELDS})
+        stats["n_buy"] = counts["n_buy"].astype(np.int64)
+        stats["n_sell"] = counts["n_sell"].astype(np.int64)
+        stats["buy_hit_rate"] = counts["buy_hits"] / counts["n_buy"]
+        stats["sell_hit_rate"] = counts["sell_hits"] / counts["n_sell"]
+        stats["hit_rate"] = (counts["buy_hits"] + counts["sell_hits"]) / n_signals
+        stats["avg_buy_return"] = counts["buy_ret"] / counts["n_buy"]
+        stats["avg_sell_return"] = counts["sell_ret"] / counts["n_sell"]
+        # prinos ako se sledi signalot: long na BUY, short na SELL
+        stats["avg_signal_return"] = (counts["buy_ret"] - counts["sell_ret"]) / n_signals
+
+    return SweepResult(stats=stats, signals=signals)
@@ -1,20 +1,29 @@
 import warnings
 warnings.filterwarnings("ignore")
 
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from dataclasses import dataclass
-from typing import Literal, Dict, Tuple
+from typing import Literal, Dict, List, Tuple
 import numpy as np
 import pandas as pd
 import yfinance as yf
 import ta
 
+from technical.history_source import load_history, load_panel
+from technical.indicators import indicator_panel
+
 
 
 Timeframe = Literal["1D", "1W", "1M"]
+Source = Literal["yfinance", "db"]
 
+ROLLUP_INTERVALS = {"1W": ("1w", "W"), "1M": ("1M", "M")}
 
 
-def resample_ohlcv(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+
+def resample_ohlcv(df: pd.DataFrame, rule: str, copy: bool = True) -> pd.DataFrame:
     if isinstance(df.columns, pd.MultiIndex):
         flat_cols = []
         for c in df.columns:
@@ -35,7 +44,8 @@ def resample_ohlcv(df: pd.DataFrame, rule: str) -> pd.DataFrame:
     if not cols:
         raise KeyError(f"No valid OHLCV columns found! Got: {list(df.columns)}")
 
-    df = df[cols].copy()
+    # df[cols] veke e nova tabela, copy=False ja preskoknuva vtorata kopija
+    df = df[cols].copy() if copy else df[cols]
 
     if not np.issubdtype(df.index.dtype, np.datetime64):
         df.index = pd.to_datetime(df.index)
@@ -48,7 +58,26 @@ def resample_ohlcv(df: pd.DataFrame, rule: str) -> pd.DataFrame:
 
 
 
-def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
+def add_indicators(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+    d = df if inplace else df.copy()
+
+    close = d["Close"].squeeze()
+    high = d["High"].squeeze()
+    low = d["Low"].squeeze()
+    volume = d["Volume"].squeeze()
+
+    adx_window = 14 if len(d) >= 14 else max(3, len(d) // 2)
+    columns = indicator_panel(high, low, close, volume, adx_window=adx_window)
+
+    for name, values in columns.items():
+        d[name] = values
+
+    return d
+
+
+
+def add_indicators_ta(df: pd.DataFrame) -> pd.DataFrame:
+    # referentna implementacija so ta bibliotekata, za proverka na kernelite
     d = df.copy()
 
     close = d["Close"].squeeze()
@@ -177,48 +206,155 @@ def rule_score_row(row: pd.Series, cfg: SignalConfig) -> Tuple[int, Dict[str, in
     return total_score, score_breakdown
 
 
-def generate_signals(df: pd.DataFrame, cfg: SignalConfig = SignalConfig()) -> pd.DataFrame:
-    d = df.copy()
-    scores = []
-    details = []
+SCORE_COLUMNS = {
+    "RSI": "SCORE_RSI",
+    "MACD": "SCORE_MACD",
+    "STOCH": "SCORE_STOCH",
+    "CCI": "SCORE_CCI",
+    "MAs": "SCORE_MAS",
+}
+
+SCORE_INPUTS = [
+    "RSI_14", "MACD", "MACD_SIGNAL", "STOCH_%K", "CCI_20", "ADX_14", "EMA_20", "SMA_20",
+    "WMA_20", "BB_LOWER", "BB_UPPER", "VOL_MA_20", "Close", "Volume",
+]
+
+
+def numeric_column(df: pd.DataFrame, name: str) -> np.ndarray:
+    if name not in df.columns:
+        return np.full(len(df), np.nan)
+    col = df[name]
+    if isinstance(col, pd.DataFrame):
+        # isto kako safe_float: kaj povekje koloni so isto ime se zema poslednata
+        col = col.iloc[:, -1]
+    return pd.to_numeric(col, errors="coerce").to_numpy(dtype=np.float64)
+
+
+def _band(x: np.ndarray, buy, sell) -> np.ndarray:
+    # NaN sporedbite se False, pa NaN dava 0 (komponentata ja nema vo rule_score_row)
+    return np.where(x < buy, 1, np.where(x > sell, -1, 0))
+
+
+def _sign(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.where(np.isnan(a) | np.isnan(b), 0, np.where(a > b, 1, -1))
 
-    for _, row in d.iterrows():
-        s, br = rule_score_row(row, cfg)
-        scores.append(s)
-        details.append(br)
 
-    d["TA_SCORE"] = scores
-    d["SIGNAL"] = np.where(
-        d["TA_SCORE"] >= 2, "BUY", np.where(d["TA_SCORE"] <= -2, "SELL", "HOLD")
+def score_components(cols: Dict[str, np.ndarray], cfg: SignalConfig) -> Dict[str, np.ndarray]:
+    close = cols["Close"]
+
+    ma_points = (
+        _sign(close, cols["EMA_20"])
+        + _sign(close, cols["SMA_20"])
+        + _sign(cols["WMA_20"], cols["EMA_20"])
+        + np.where(close < cols["BB_LOWER"], 1, np.where(close > cols["BB_UPPER"], -1, 0))
+        + np.where((cols["VOL_MA_20"] > 0) & (cols["Volume"] > cols["VOL_MA_20"]), 1, 0)
     )
-    d["SCORE_BREAKDOWN"] = details
+    adx_strong = cols["ADX_14"] >= cfg.adx_trend
+
+    return {
+        "RSI": _band(cols["RSI_14"], cfg.rsi_buy, cfg.rsi_sell),
+        "MACD": _sign(cols["MACD"], cols["MACD_SIGNAL"]),
+        "STOCH": _band(cols["STOCH_%K"], cfg.stoch_buy, cfg.stoch_sell),
+        "CCI": _band(cols["CCI_20"], cfg.cci_buy, cfg.cci_sell),
+        "MAs": np.where(adx_strong, 2 * ma_points, ma_points),
+    }
+
+
+def signal_labels(score: np.ndarray) -> np.ndarray:
+    return np.where(score >= 2, "BUY", np.where(score <= -2, "SELL", "HOLD"))
+
+
+def generate_signals(df: pd.DataFrame, cfg: SignalConfig = SignalConfig(), inplace: bool = False) -> pd.DataFrame:
+    d = df if inplace else df.copy()
+    cols = {name: numeric_column(d, name) for name in SCORE_INPUTS}
+    parts = score_components(cols, cfg)
+
+    score = np.zeros(len(d), dtype=np.int64)
+    for key, column in SCORE_COLUMNS.items():
+        d[column] = parts[key].astype(np.int64)
+        score += d[column].to_numpy()
+
+    d["TA_SCORE"] = score
+    d["SIGNAL"] = signal_labels(score)
     return d
 
 
+def score_breakdown(df: pd.DataFrame) -> List[Dict[str, int]]:
+    # recnicite od rule_score_row, se pravat samo koga se baraat
+    present = {
+        "RSI": ~np.isnan(numeric_column(df, "RSI_14")),
+        "MACD": ~(np.isnan(numeric_column(df, "MACD")) | np.isnan(numeric_column(df, "MACD_SIGNAL"))),
+        "STOCH": ~np.isnan(numeric_column(df, "STOCH_%K")),
+        "CCI": ~np.isnan(numeric_column(df, "CCI_20")),
+        "MAs": np.ones(len(df), dtype=bool),
+    }
+    values = {key: df[column].to_numpy() for key, column in SCORE_COLUMNS.items()}
+
+    return [
+        {key: int(values[key][i]) for key in SCORE_COLUMNS if present[key][i]}
+        for i in range(len(df))
+    ]
+
+
+
+def load_price(symbol: str, start: str = "2024-01-01", end: str = None, source: Source = "yfinance") -> pd.DataFrame:
+    if source == "db":
+        return load_history(symbol, start, end)
 
-def load_price(symbol: str, start: str = "2024-01-01", end: str = None) -> pd.DataFrame:
     data = yf.download(symbol, start=start, end=end, interval="1d", auto_adjust=False, progress=False)
     data = data.dropna()
     return data
 
-def analyze(symbol: str, timeframe: Timeframe = "1D", start: str = "2024-01-01", end: str = None) -> pd.DataFrame:
-    raw = load_price(symbol, start, end)
-
+def load_timeframe(symbol: str, timeframe: Timeframe, start: str = "2024-01-01", end: str = None, source: Source = "yfinance", copy: bool = True) -> pd.DataFrame:
     if timeframe == "1D":
-        data = raw
-    elif timeframe == "1W":
-        data = resample_ohlcv(raw, "W")
-    elif timeframe == "1M":
-        data = resample_ohlcv(raw, "M")
-    else:
+        return load_price(symbol, start, end, source)
+    if timeframe not in ROLLUP_INTERVALS:
         raise ValueError("timeframe must be one of: '1D','1W','1M'")
 
-    data = add_indicators(data)
-    data = generate_signals(data)
+    interval, rule = ROLLUP_INTERVALS[timeframe]
+    if source == "db":
+        # nedelnite/mesecnite svekji gi pravi Filter4Rollup vo pipeline-ot
+        data = load_history(symbol, start, end, interval=interval)
+        if not data.empty:
+            return data
+
+    return resample_ohlcv(load_price(symbol, start, end, source), rule, copy=copy)
+
+def analyze(symbol: str, timeframe: Timeframe = "1D", start: str = "2024-01-01", end: str = None, source: Source = "yfinance", copy: bool = True) -> pd.DataFrame:
+    # copy=False: indikatorite i signalite se pisuvaat vo istata tabela sto ja vratil load_timeframe
+    data = load_timeframe(symbol, timeframe, start, end, source, copy=copy)
+    data = add_indicators(data, inplace=not copy)
+    data = generate_signals(data, inplace=not copy)
     return data
 
 
 
+def signals_panel(panel: Dict[str, np.ndarray], cfg: SignalConfig = SignalConfig()) -> Dict[str, np.ndarray]:
+    parts = score_components(panel, cfg)
+    score = sum(parts[key].astype(np.int64) for key in SCORE_COLUMNS)
+
+    out = {column: parts[key].astype(np.int64) for key, column in SCORE_COLUMNS.items()}
+    out["TA_SCORE"] = score
+    out["SIGNAL"] = signal_labels(score)
+    return out
+
+def analyze_panel(symbols, start: str = "2024-01-01", end: str = None, cfg: SignalConfig = SignalConfig()) -> Dict[str, pd.DataFrame]:
+    # site simboli od lokalnata baza odednas, sekoja kolona e (datumi x simboli)
+    fields = load_panel(symbols, start, end)
+    close = fields["Close"]
+
+    panel = indicator_panel(fields["High"], fields["Low"], close, fields["Volume"])
+    panel["Close"] = close.to_numpy()
+    panel["Volume"] = fields["Volume"].to_numpy()
+    panel.update(signals_panel(panel, cfg))
+
+    return {
+        name: pd.DataFrame(values, index=close.index, columns=close.columns)
+        for name, values in panel.items()
+    }
+
+
+
 def latest_summary(df: pd.DataFrame) -> Dict[str, str]:
     last = df.iloc[-1]
 
@@ -255,9 +391,129 @@ def latest_summary(df: pd.DataFrame) -> Dict[str, str]:
 
 
 
+SUMMARY_INPUTS = [
+    "Close", "RSI_14", "MACD", "MACD_SIGNAL", "STOCH_%K", "ADX_14", "CCI_20",
+    "EMA_20", "BB_LOWER", "BB_UPPER", "Volume", "VOL_MA_20", "TA_SCORE",
+]
+
+BB_ZONES = np.array(["BelowLower", "Inside", "AboveUpper"])
+
+
+def summary_dtype(symbol_width: int = 16) -> np.dtype:
+    return np.dtype([
+        ("symbol", f"U{symbol_width}"),
+        ("date", "datetime64[D]"),
+        ("close", "f8"),
+        ("rsi14", "f8"),
+        ("macd_above_signal", "?"),
+        ("stoch_k", "f8"),
+        ("adx14", "f8"),
+        ("cci20", "f8"),
+        ("above_ema20", "?"),
+        ("bb_zone", "i1"),
+        ("vol_above_ma20", "?"),
+        ("ta_score", "i8"),
+        ("signal", "U4"),
+    ])
+
+
+def _summary_array(symbols: List[str], dates: np.ndarray, last: Dict[str, np.ndarray]) -> np.ndarray:
+    # istite pravila kako latest_summary, no po kolona za site simboli odednas
+    width = max([len(s) for s in symbols] + [1])
+    out = np.empty(len(symbols), dtype=summary_dtype(width))
+    close = last["Close"]
+    score = np.nan_to_num(last["TA_SCORE"]).astype(np.int64)
+
+    out["symbol"] = symbols
+    out["date"] = dates
+    out["close"] = close
+    out["rsi14"] = last["RSI_14"]
+    out["macd_above_signal"] = last["MACD"] > last["MACD_SIGNAL"]
+    out["stoch_k"] = last["STOCH_%K"]
+    out["adx14"] = last["ADX_14"]
+    out["cci20"] = last["CCI_20"]
+    out["above_ema20"] = close > last["EMA_20"]
+    out["bb_zone"] = np.where(close < last["BB_LOWER"], -1, np.where(close > last["BB_UPPER"], 1, 0))
+    out["vol_above_ma20"] = last["Volume"] > last["VOL_MA_20"]
+    out["ta_score"] = score
+    out["signal"] = signal_labels(score)
+    return out
+
+
+def summary_table(frames: Dict[str, pd.DataFrame]) -> np.ndarray:
+    # rezultati od analyze po simbol -> edna strukturirana niza, bez formatiranje
+    symbols = list(frames)
+    filled = [df for df in frames.values() if len(df)]
+    has_data = np.array([len(df) > 0 for df in frames.values()], dtype=bool)
+
+    def last_value(df, name):
+        if name not in df.columns:
+            return np.nan
+        col = df[name]
+        return col.iat[-1, -1] if isinstance(col, pd.DataFrame) else col.iat[-1]
+
+    last = {}
+    for name in SUMMARY_INPUTS:
+        values = np.full(len(symbols), np.nan)
+        values[has_data] = pd.to_numeric(pd.Series([last_value(df, name) for df in filled], dtype=object), errors="coerce")
+        last[name] = values
+
+    dates = np.full(len(symbols), np.datetime64("NaT"), dtype="datetime64[D]")
+    dates[has_data] = np.array([df.index[-1] for df in filled], dtype="datetime64[ns]").astype("datetime64[D]")
+    return _summary_array(symbols, dates, last)
+
+
+def summary_table_panel(panel: Dict[str, pd.DataFrame]) -> np.ndarray:
+    # rezultat od analyze_panel; za sekoj simbol se zema posledniot red so Close
+    close = panel["Close"]
+    valid = close.notna().to_numpy()
+    n = len(close)
+
+    last_row = n - 1 - np.argmax(valid[::-1], axis=0)
+    has_data = valid.any(axis=0)
+    cols = np.arange(close.shape[1])
+
+    last = {}
+    for name in SUMMARY_INPUTS:
+        values = panel[name].to_numpy(dtype=np.float64)
+        last[name] = np.where(has_data, values[last_row, cols], np.nan) if n else np.full(len(cols), np.nan)
+
+    dates = np.full(len(cols), np.datetime64("NaT"), dtype="datetime64[D]")
+    if n:
+        dates[has_data] = close.index.to_numpy().astype("datetime64[D]")[last_row[has_data]]
+    return _summary_array([str(s) for s in close.columns], dates, last)
+
+
+def format_summary(table: np.ndarray) -> Dict[str, Dict[str, str]]:
+    # posleden cekor za prikaz: isti stringovi kako latest_summary, po simbol
+    def fixed(name):
+        return np.char.mod("%.2f", table[name])
+
+    columns = {
+        "date": np.datetime_as_string(table["date"], unit="D"),
+        "close": fixed("close"),
+        "rsi14": fixed("rsi14"),
+        "macd>signal": np.where(table["macd_above_signal"], "YES", "NO"),
+        "stoch_k": fixed("stoch_k"),
+        "adx14": fixed("adx14"),
+        "cci20": fixed("cci20"),
+        "price_vs_ema20": np.where(table["above_ema20"], "Above", "Below"),
+        "bb_zone": BB_ZONES[table["bb_zone"] + 1],
+        "vol>volma20": np.where(table["vol_above_ma20"], "YES", "NO"),
+        "ta_score": table["ta_score"].astype(str),
+        "signal": table["signal"],
+    }
+
+    return {
+        str(symbol): {key: str(values[i]) for key, values in columns.items()}
+        for i, symbol in enumerate(table["symbol"])
+    }
+
+
+
 if __name__ == "__main__":
     for tf in ("1D", "1W", "1M"):
-        df_tf = analyze("BTC-USD", timeframe=tf, start="2024-01-01")
+        df_tf = analyze("BTC-USD", timeframe=tf, start="2024-01-01", source="db")
         summary = latest_summary(df_tf)
         print(f"[{tf}] {summary}")
 